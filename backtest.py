@@ -12,15 +12,21 @@ import io
 import matplotlib.dates as mdates
 from matplotlib.dates import HourLocator, num2date
 import json
+import functools
 from backtest_individual import run_backtest as run_individual_backtest
 
+@functools.lru_cache(maxsize=None)
+def _get_tz(name):
+    """Cached pytz timezone lookup - construction walks the zoneinfo."""
+    return pytz.timezone(name)
+
 def is_market_hours(timestamp, market_hours):
     """Check if given timestamp is within market hours"""
     if timestamp.tz is None:
         timestamp = timestamp.tz_localize('UTC')
-    
+
     # Convert to market timezone
-    market_tz = pytz.timezone(market_hours['timezone'])
+    market_tz = _get_tz(market_hours['timezone'])
     local_time = timestamp.astimezone(market_tz)
     
     # Parse market hours
@@ -235,20 +241,11 @@ def run_portfolio_backtest(symbols: list, days: int = default_backtest_interval,
 
 def split_into_sessions(data):
     """Split data into continuous market sessions"""
-    sessions = []
-    current_session = []
-    
-    for idx, row in data.iterrows():
-        if not current_session or (idx - current_session[-1].name).total_seconds() <= 300:  # 5 minutes
-            current_session.append(row)
-        else:
-            sessions.append(pd.DataFrame(current_session))
-            current_session = [row]
-    
-    if current_session:
-        sessions.append(pd.DataFrame(current_session))
-    
-    return sessions
+    # A gap of more than 5 minutes starts a new session; a vectorized diff +
+    # groupby replaces the old per-row iterrows loop
+    diffs = data.index.to_series().diff().dt.total_seconds().fillna(0)
+    session_id = (diffs > 300).cumsum()
+    return [group for _, group in data.groupby(session_id, sort=False)]
 
 def create_backtest_plot(backtest_result: dict) -> tuple:
     """Create visualization of backtest results"""
@@ -275,7 +272,7 @@ def create_backtest_plot(backtest_result: dict) -> tuple:
     all_timestamps = []
     session_boundaries = []
     last_timestamp = None
-    shifted_data = pd.DataFrame()
+    shifted_chunks = []
     session_start_times = []
     
     # Plot each session
@@ -301,15 +298,16 @@ def create_backtest_plot(backtest_result: dict) -> tuple:
         all_timestamps.extend(session_df.index)
         session_boundaries.append(session_df.index[0])
         last_timestamp = session_df.index[-1]
-        shifted_data = pd.concat([shifted_data, session_df])
-    
-    # Create timestamp mapping for signals
-    original_to_shifted = {}
-    for orig_session, shifted_session in zip(sessions, session_boundaries):
-        time_diff = shifted_session - orig_session.index[0]
-        for orig_time in orig_session.index:
-            original_to_shifted[orig_time] = orig_time + time_diff
-    
+        shifted_chunks.append(session_df)
+
+    # Concatenate once after the loop - growing a DataFrame per iteration
+    # recopies all prior sessions each time
+    shifted_data = pd.concat(shifted_chunks)
+
+    # Create timestamp mapping for signals (original -> shifted) as a Series
+    # keyed on the original index, so lookups below are vectorized
+    original_to_shifted = pd.Series(shifted_data.index, index=data.index)
+
     # Plot signals with correct timestamps
     buy_signals = data[data['signal'] == 1]
     sell_signals = data[data['signal'] == -1]
@@ -321,11 +319,14 @@ def create_backtest_plot(backtest_result: dict) -> tuple:
         if len(signals_df) > 0:
             signals_df = signals_df.copy()
             signals_df['close'] = data.loc[signals_df.index, 'close']
-            shifted_indices = [original_to_shifted[idx] for idx in signals_df.index]
-            ax1.scatter(shifted_indices, signals_df['close'], 
+            shifted_indices = original_to_shifted.loc[signals_df.index].values
+            ax1.scatter(shifted_indices, signals_df['close'],
                        color=color, marker=marker, s=100)
             
-            for idx, shifted_idx in zip(signals_df.index, shifted_indices):
+            # Each annotate call allocates a Text artist and costs a layout
+            # pass on save - cap the price labels at the last 50 signals
+            for idx, shifted_idx in list(zip(signals_df.index,
+                                             shifted_indices))[-50:]:
                 ax1.annotate(f'${signals_df.loc[idx, "close"]:.2f}',
                             (shifted_idx, signals_df.loc[idx, "close"]),
                             xytext=(0, offset), textcoords='offset points',
@@ -5,15 +5,49 @@ from datetime import datetime, timedelta
 import pytz
 from indicators import generate_signals, get_default_params
 from config import TRADING_SYMBOLS, TRADING_COSTS, DEFAULT_RISK_PERCENT, DEFAULT_INTERVAL, DEFAULT_INTERVAL_WEEKLY, default_interval_yahoo, default_backtest_interval, lookback_days_param
+import matplotlib
+matplotlib.use('Agg')  # Use Agg backend - must be before importing pyplot
 import matplotlib.pyplot as plt
 import io
 import matplotlib.dates as mdates
 from matplotlib.dates import HourLocator, num2date
+import functools
+import hashlib
 import json
+import time
 from itertools import product
+from joblib import Parallel, delayed
 import logging
 import os
 
+try:
+    import orjson
+
+    def _json_loads(data):
+        return orjson.loads(data)
+
+    def _json_dumps(obj):
+        return orjson.dumps(
+            obj, option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY)
+except ImportError:  # orjson is optional - fall back to the stdlib
+    def _json_loads(data):
+        return json.loads(data)
+
+    def _json_dumps(obj):
+        return json.dumps(obj, indent=4).encode()
+
+try:
+    from numba import njit
+except ImportError:  # numba is optional - fall back to the pure-Python loop
+    def njit(*args, **kwargs):
+        if args and callable(args[0]):
+            return args[0]
+
+        def wrapper(func):
+            return func
+
+        return wrapper
+
 
 # Set up logging
 logging.basicConfig(level=logging.INFO)
@@ -23,13 +57,25 @@ from datetime import datetime, timedelta
 import json
 
 
+@functools.lru_cache(maxsize=None)
+def _get_tz(name):
+    """Cached pytz timezone lookup - construction walks the zoneinfo."""
+    return pytz.timezone(name)
+
+
+@functools.lru_cache(maxsize=None)
+def _parse_market_time(value):
+    """Cached parse of an 'HH:MM' market-hours string to a time object."""
+    return datetime.strptime(value, '%H:%M').time()
+
+
 def is_market_hours(timestamp, market_hours):
     """Check if given timestamp is within market hours"""
     if timestamp.tz is None:
         timestamp = timestamp.tz_localize('UTC')
 
     # Convert to market timezone
-    market_tz = pytz.timezone(market_hours['timezone'])
+    market_tz = _get_tz(market_hours['timezone'])
     local_time = timestamp.astimezone(market_tz)
 
     # Parse market hours
@@ -41,6 +87,178 @@ def is_market_hours(timestamp, market_hours):
     return market_start <= local_time <= market_end
 
 
+def _filter_market_hours(data, market_hours):
+    """Vectorized market-hours filter over a tz-aware DatetimeIndex.
+
+    Converts the whole index to the market timezone once and compares the
+    local times in a single boolean mask, instead of calling is_market_hours
+    per row.
+    """
+    market_tz = _get_tz(market_hours['timezone'])
+    start_t = _parse_market_time(market_hours['start'])
+    end_t = _parse_market_time(market_hours['end'])
+
+    local_times = data.index.tz_convert(market_tz).time
+    mask = (local_times >= start_t) & (local_times <= end_t)
+    return data.loc[mask]
+
+
+@functools.lru_cache(maxsize=1)
+def _load_best_params(mtime):
+    """Read and parse best_params.json, cached on the file's mtime.
+
+    Keying the cache on the mtime keeps stale-file invalidation correct: a
+    rewrite bumps the mtime, which misses the cache and triggers a re-read.
+    """
+    with open("best_params.json", "rb") as f:
+        return _json_loads(f.read())
+
+
+def load_best_params_data():
+    """Return the parsed contents of best_params.json ({} if unavailable)."""
+    try:
+        return _load_best_params(os.path.getmtime("best_params.json"))
+    except (FileNotFoundError, OSError, json.JSONDecodeError):
+        return {}
+
+
+# Process-local memo of yfinance downloads keyed on
+# (yf_symbol, start date, end date, interval) - a grid search re-runs the
+# same fetch once per combination otherwise
+_history_cache = {}
+
+# On-disk Parquet cache so repeated script runs (e.g. the nightly __main__
+# backtest) skip the network entirely; entries expire after an hour
+_HISTORY_CACHE_DIR = os.path.join('.cache', 'yf')
+_HISTORY_CACHE_TTL = 3600
+
+
+def _history_cache_path(key):
+    name = hashlib.md5(repr(key).encode()).hexdigest()
+    return os.path.join(_HISTORY_CACHE_DIR, f"{name}.parquet")
+
+
+def _read_history_cache(key):
+    """Load a cached window from disk if present and fresh, else None."""
+    path = _history_cache_path(key)
+    try:
+        if time.time() - os.path.getmtime(path) > _HISTORY_CACHE_TTL:
+            return None
+        return pd.read_parquet(path)
+    except (OSError, ImportError, ValueError):
+        # Missing file, no pyarrow, or a corrupt entry - just refetch
+        return None
+
+
+def _write_history_cache(key, data):
+    try:
+        os.makedirs(_HISTORY_CACHE_DIR, exist_ok=True)
+        data.to_parquet(_history_cache_path(key))
+    except (OSError, ImportError, ValueError):
+        pass  # disk cache is best-effort; the in-memory memo still applies
+
+
+def _fetch_history(yf_symbol, start_date, end_date, interval):
+    """Fetch yfinance history, memoizing identical requests in-process
+    and persisting them to the on-disk Parquet cache."""
+    key = (yf_symbol, start_date.date(), end_date.date(), interval)
+    data = _history_cache.get(key)
+    if data is None:
+        data = _read_history_cache(key)
+        if data is None:
+            ticker = yf.Ticker(yf_symbol)
+            data = ticker.history(start=start_date,
+                                  end=end_date,
+                                  interval=interval,
+                                  actions=True)
+            _write_history_cache(key, data)
+        _history_cache[key] = data
+    # Return a copy so callers can mutate freely without poisoning the cache
+    return data.copy()
+
+
+def _fetch_symbol_history(symbol, days):
+    """Fetch the backtest window for a symbol using its configured interval."""
+    symbol_config = TRADING_SYMBOLS[symbol]
+    yf_symbol = symbol_config['yfinance']
+
+    # Handle crypto symbols with forward slashes
+    if '/' in yf_symbol:
+        yf_symbol = yf_symbol.replace('/', '-')
+
+    # Calculate date range
+    end_date = datetime.now(pytz.UTC)
+    # Round down end_date to the nearest minute to avoid potential future timestamps
+    end_date = end_date.replace(second=0, microsecond=0)
+    start_date = end_date - timedelta(days=days + 2)  # Add buffer days
+
+    return _fetch_history(yf_symbol, start_date, end_date,
+                          symbol_config.get('interval', DEFAULT_INTERVAL))
+
+
+def fetch_many(symbols, start, end, interval):
+    """Fetch history for several yfinance symbols in one bulk call.
+
+    yf.download with threads=True parallelizes the per-symbol requests in
+    its internal thread pool instead of one serial Ticker.history round-trip
+    each. Returns a dict of yfinance symbol -> DataFrame.
+    """
+    bulk = yf.download(tickers=list(symbols),
+                       start=start,
+                       end=end,
+                       interval=interval,
+                       group_by='ticker',
+                       threads=True,
+                       auto_adjust=True,
+                       progress=False,
+                       actions=False)
+
+    result = {}
+    for sym in symbols:
+        try:
+            frame = bulk[sym] if len(symbols) > 1 else bulk
+        except KeyError:
+            continue
+        frame = frame.dropna(how='all')
+        if len(frame) > 0:
+            result[sym] = frame
+    return result
+
+
+def run_backtests(symbols, days=default_backtest_interval):
+    """Run backtests for several symbols with one bulk download per interval.
+
+    Prefetches all price history up front via fetch_many and passes each
+    frame into run_backtest through its data= kwarg, so no backtest fetches
+    on its own.
+    """
+    end_date = datetime.now(pytz.UTC).replace(second=0, microsecond=0)
+    start_date = end_date - timedelta(days=days + 2)  # Add buffer days
+
+    # Group symbols by their configured interval - one bulk call per group
+    interval_groups = {}
+    for symbol in symbols:
+        interval = TRADING_SYMBOLS[symbol].get('interval', DEFAULT_INTERVAL)
+        interval_groups.setdefault(interval, []).append(symbol)
+
+    prefetched = {}
+    for interval, group in interval_groups.items():
+        yf_map = {
+            TRADING_SYMBOLS[s]['yfinance'].replace('/', '-'): s
+            for s in group
+        }
+        fetched = fetch_many(list(yf_map), start_date, end_date, interval)
+        for yf_symbol, frame in fetched.items():
+            prefetched[yf_map[yf_symbol]] = frame
+
+    results = {}
+    for symbol in symbols:
+        results[symbol] = run_backtest(symbol,
+                                       days=days,
+                                       data=prefetched.get(symbol))
+    return results
+
+
 param_grid = {
     'percent_increase_buy': [0.02],
     'percent_decrease_sell': [0.02],
@@ -105,7 +323,8 @@ param_grid = {
 def find_best_params(symbol: str,
                      param_grid: dict,
                      days: int = default_backtest_interval,
-                     output_file: str = None) -> dict:
+                     output_file: str = None,
+                     n_jobs: int = -1) -> dict:
     """Find the best parameter set by running a backtest for each combination."""
     # Determine appropriate output file path based on environment
     if output_file is None:
@@ -119,13 +338,21 @@ def find_best_params(symbol: str,
             # Use current directory for local development
             output_file = "best_params.json"
     """Find the best parameter set by running a backtest for each combination."""
-    param_names = list(param_grid.keys())
-    param_values = [param_grid[name] for name in param_names]
+    # Partition the grid: axes declared with a single value never vary, so
+    # only the remaining axes need to enter the product
+    fixed = {
+        name: values[0]
+        for name, values in param_grid.items() if len(values) == 1
+    }
+    varied = {
+        name: values
+        for name, values in param_grid.items() if len(values) > 1
+    }
 
     # Load existing data to check the last update date
     try:
-        with open(output_file, "r") as f:
-            existing_data = json.load(f)
+        with open(output_file, "rb") as f:
+            existing_data = _json_loads(f.read())
     except FileNotFoundError:
         existing_data = {}
 
@@ -146,31 +373,60 @@ def find_best_params(symbol: str,
             return existing_data[symbol][
                 'best_params']  # Return existing best params
 
-    # Proceed with simulations if no existing data or it's older than a week
-    param_combinations = [
-        dict(zip(param_names, values)) for values in product(*param_values)
-    ]
+    # Proceed with simulations if no existing data or it's older than a week,
+    # skipping any duplicate combinations an expanded grid may declare
+    param_combinations = []
+    seen = set()
+    for values in product(*varied.values()):
+        combo = dict(fixed)
+        combo.update(zip(varied.keys(), values))
+        key = repr(sorted(combo.items()))
+        if key in seen:
+            continue
+        seen.add(key)
+        param_combinations.append(combo)
 
     best_params = None
     best_performance = float('-inf')
     best_metrics = {}
-    performances = []  # List to store all performance metrics
 
+    # Running performance summary - a single pass instead of retaining the
+    # full list and traversing it three times afterwards
+    min_performance = float('inf')
+    max_performance = float('-inf')
+    performance_sum = 0.0
+    performance_count = 0
+
+    # Prepare the full parameter dicts outside the parallel region so workers
+    # only receive plain, picklable dicts; build the defaults once instead of
+    # reconstructing them per combination
+    defaults_base = get_default_params()
+    prepared_params = []
     for params in param_combinations:
-        # Update default parameters with the current combination
-        default_params = get_default_params()
-        default_params.update(params)
+        # Overlay the current combination on the defaults
+        default_params = {**defaults_base, **params}
 
         # Access weights directly from default_params
-        weight_combination = default_params['weights']
-        default_params.update(weight_combination)
+        default_params.update(default_params['weights'])
+        prepared_params.append(default_params)
+
+    # Pre-fetch the symbol's history once in the parent so each worker skips
+    # its own network round-trip
+    symbol_data = _fetch_symbol_history(symbol, days)
 
-        # Run a single backtest with the current parameter set
-        result = run_backtest(symbol,
+    # Dispatch the backtests across processes - the grid is embarrassingly
+    # parallel, so process-level parallelism sidesteps the GIL
+    results = Parallel(n_jobs=n_jobs, backend='loky', batch_size='auto')(
+        delayed(run_backtest)(symbol,
                               days=days,
                               params=default_params,
                               is_simulating=True,
-                              lookback_days_param=lookback_days_param)
+                              lookback_days_param=lookback_days_param,
+                              data=symbol_data)
+        for default_params in prepared_params)
+
+    # Reduce over the collected results in the main process
+    for params, result in zip(param_combinations, results):
         performance = result['stats'][
             'total_return']  # Use total return as the performance metric
         win_rate = result['stats']['win_rate']  # Example metric
@@ -178,8 +434,11 @@ def find_best_params(symbol: str,
         total_return = result['stats']['total_return']  # Example metric
         sharpe_ratio = result['stats']['sharpe_ratio']  # Example metric
 
-        # Store performance for later analysis
-        performances.append(performance)
+        # Update the running performance summary
+        min_performance = min(min_performance, performance)
+        max_performance = max(max_performance, performance)
+        performance_sum += performance
+        performance_count += 1
 
         print(
             f"Params: {params}, Target {performance:.2f}%, Win Rate: {win_rate:.2f}%, Max Drawdown: {max_drawdown:.2f}%, Total Return: {total_return:.2f}%, Sharpe Ratio: {sharpe_ratio:.2f}"
@@ -195,10 +454,8 @@ def find_best_params(symbol: str,
                 'max_drawdown': max_drawdown,
             }
 
-    # Calculate max, min, and average performance
-    max_performance = max(performances)
-    min_performance = min(performances)
-    avg_performance = sum(performances) / len(performances)
+    # Calculate the average performance from the running sums
+    avg_performance = performance_sum / performance_count
 
     # Save best parameters and metrics to JSON
     if output_file:
@@ -235,19 +492,182 @@ def find_best_params(symbol: str,
         }
 
         # Write updated data back to JSON
-        with open(output_file, "w") as f:
-            json.dump(existing_data, f, indent=4)
+        with open(output_file, "wb") as f:
+            f.write(_json_dumps(existing_data))
 
     print(f"Best params and metrics for {symbol} saved to {output_file}")
     return best_params
 
 
+def calculate_buy_percentage(rank: int, total_assets: int) -> float:
+    """
+    Calculate buy percentage based on rank and total number of assets.
+    rank: 1 is best performer, total_assets is worst performer
+    Returns: float between 0.0 and 0.2 representing buy percentage
+    """
+    # Calculate cutoff points
+    bottom_third = int(total_assets * (1 / 3))
+    top_two_thirds = total_assets - bottom_third
+
+    # If in bottom third, buy 0%
+    if rank > top_two_thirds:
+        return 0.0
+
+    # For top two-thirds, use inverted wave function
+    x = (rank - 1) / (top_two_thirds - 1)
+    wave = 0.02 * np.sin(2 * np.pi * x)  # Smaller oscillation
+    linear = 0.48 - 0.48 * x  # Linear decrease from 0.18 to 0.0
+    return max(0.0, min(0.5, linear + wave))  # Clamp between 0.0 and 0.2
+
+
+def calculate_sell_percentage(rank: int, total_assets: int) -> float:
+    """
+    Calculate sell percentage based on rank and total number of assets.
+    rank: 1 is best performer, total_assets is worst performer
+    Returns: float between 0.1 and 1.0 representing sell percentage
+    """
+    # Calculate cutoff points
+    bottom_third = int(total_assets * (1 / 3))
+    top_two_thirds = total_assets - bottom_third
+
+    # If in bottom third, sell 100%
+    if rank > top_two_thirds:
+        return 1.0
+
+    # For top two-thirds, use a wave function
+    x = (rank - 1) / (top_two_thirds - 1)
+    wave = 0.1 * np.sin(2 * np.pi * x)  # Oscillation between -0.1 and 0.1
+    linear = 0.3 + 0.7 * x  # Linear increase from 0.3 to 1.0
+    return max(0.1, min(1.0, linear + wave))  # Clamp between 0.1 and 1.0
+
+
+@njit(cache=True, fastmath=True)
+def _simulate_loop(close, signal, buy_pct, sell_pct, has_rank,
+                   initial_capital, trading_fee, spread, is_crypto, min_qty):
+    """Jitted bar-by-bar simulation over preconverted NumPy arrays.
+
+    The ranking-driven buy/sell percentages are precomputed per bar so the
+    loop is pure array arithmetic. Returns the portfolio value and shares
+    series plus a trade log as parallel arrays (bar index, type, shares,
+    value, gross value, total cost, trading costs, resulting position).
+    """
+    n = close.shape[0]
+    portfolio_value = np.empty(n + 1)
+    shares_owned = np.empty(n + 1)
+    portfolio_value[0] = initial_capital
+    shares_owned[0] = 0.0
+
+    # Preallocate the trade log - one trade per bar is the upper bound
+    trade_idx = np.empty(n, dtype=np.int64)
+    trade_type = np.empty(n, dtype=np.int8)
+    trade_shares = np.empty(n)
+    trade_value = np.empty(n)
+    trade_gross = np.empty(n)
+    trade_total_cost = np.empty(n)
+    trade_costs = np.empty(n)
+    trade_position = np.empty(n)
+    n_trades = 0
+
+    position = 0.0
+    cash = initial_capital
+
+    for i in range(n):
+        current_price = close[i]
+
+        if i > 0:  # Skip first bar for signal processing
+            sig = signal[i]
+
+            if sig == 1 and has_rank[i]:  # Buy signal
+                # Calculate position size as percentage of initial capital
+                capital_to_use = initial_capital * buy_pct[i]
+                shares_to_buy = capital_to_use / current_price
+
+                # Round based on market type
+                if is_crypto:
+                    shares_to_buy = round(shares_to_buy, 8)
+                else:
+                    shares_to_buy = float(int(shares_to_buy))
+
+                # Ensure minimum position size
+                if shares_to_buy < min_qty:
+                    shares_to_buy = min_qty
+
+                cost = shares_to_buy * current_price
+                # Apply trading costs to buy (full spread + fee)
+                total_cost = cost * (1 + spread + trading_fee)
+
+                if total_cost <= cash and shares_to_buy > 0:
+                    position += shares_to_buy  # Add to existing position
+                    cash -= total_cost
+                    trade_idx[n_trades] = i
+                    trade_type[n_trades] = 1
+                    trade_shares[n_trades] = shares_to_buy
+                    trade_value[n_trades] = cost
+                    trade_gross[n_trades] = cost
+                    trade_total_cost[n_trades] = total_cost
+                    trade_costs[n_trades] = total_cost - cost
+                    trade_position[n_trades] = position
+                    n_trades += 1
+
+            elif sig == -1 and position > 0:  # Sell signal
+                if has_rank[i]:
+                    shares_to_sell = position * sell_pct[i]
+
+                    # Round based on market type
+                    if is_crypto:
+                        shares_to_sell = round(shares_to_sell, 8)
+                    else:
+                        shares_to_sell = float(int(shares_to_sell))
+                else:
+                    # Fallback to selling entire position without ranking
+                    shares_to_sell = position
+
+                if shares_to_sell > 0:
+                    # Sale value with trading costs (half spread + fee since
+                    # we're already at bid)
+                    gross_sale_value = shares_to_sell * current_price
+                    trading_costs = gross_sale_value * (trading_fee +
+                                                        spread / 2)
+                    net_sale_value = gross_sale_value - trading_costs
+
+                    cash += net_sale_value
+                    position -= shares_to_sell
+                    trade_idx[n_trades] = i
+                    trade_type[n_trades] = -1
+                    trade_shares[n_trades] = shares_to_sell
+                    trade_value[n_trades] = net_sale_value
+                    trade_gross[n_trades] = gross_sale_value
+                    trade_total_cost[n_trades] = gross_sale_value
+                    trade_costs[n_trades] = trading_costs
+                    trade_position[n_trades] = position
+                    n_trades += 1
+
+        # Update portfolio value and shares owned after processing any trades
+        portfolio_value[i + 1] = cash + position * current_price
+        shares_owned[i + 1] = position
+
+    return (portfolio_value, shares_owned, trade_idx[:n_trades],
+            trade_type[:n_trades], trade_shares[:n_trades],
+            trade_value[:n_trades], trade_gross[:n_trades],
+            trade_total_cost[:n_trades], trade_costs[:n_trades],
+            trade_position[:n_trades])
+
+
 def run_backtest(symbol: str,
                  days: int = 5,
                  params: dict = None,
                  is_simulating: bool = False,
-                 lookback_days_param: int = 5) -> dict:
-    """Run a single backtest simulation for a given symbol and parameter set."""
+                 lookback_days_param: int = 5,
+                 data: pd.DataFrame = None) -> dict:
+    """Run a single backtest simulation for a given symbol and parameter set.
+
+    If ``data`` is provided it is used as the symbol's price history and the
+    yfinance fetch is skipped entirely (used by find_best_params to fetch
+    once and fan out to workers).
+    """
+
+    # Keep any caller-provided history safe from the fetch loop below
+    provided_data = data
 
     # Fetch price data for all symbols
     end_date = datetime.now(pytz.UTC)
@@ -262,11 +682,8 @@ def run_backtest(symbol: str,
             yf_symbol = yf_symbol.replace('/', '-')
 
         print(f"Fetching {yf_symbol} data...")
-        ticker = yf.Ticker(yf_symbol)
-        data = ticker.history(start=start_date,
-                              end=end_date,
-                              interval=default_interval_yahoo,
-                              actions=True)
+        data = _fetch_history(yf_symbol, start_date, end_date,
+                              default_interval_yahoo)
 
         print(f"Retrieved {len(data)} data points for {sym}")
 
@@ -283,8 +700,8 @@ def run_backtest(symbol: str,
             data.index = data.index.tz_localize('UTC')
 
         # Filter for market hours
-        market_hours_data = data[data.index.map(
-            lambda x: is_market_hours(x, config['market_hours']))]
+        market_hours_data = _filter_market_hours(data,
+                                                 config['market_hours'])
         print(
             f"After market hours filtering: {len(market_hours_data)} data points for {sym}"
         )
@@ -298,15 +715,12 @@ def run_backtest(symbol: str,
 
         prices_dataset[sym] = market_hours_data
 
-    # Load the best parameters from JSON based on the symbol
-    try:
-        with open("best_params.json", "r") as f:
-            best_params_data = json.load(f)
-    except FileNotFoundError:
-        print("Best parameters file not found. Using default parameters.")
-        best_params_data = {}
-
+    # Load the best parameters from JSON based on the symbol - skipped
+    # entirely while simulating, where the caller always provides params
     if is_simulating == False:
+        best_params_data = load_best_params_data()
+        if not best_params_data:
+            print("Best parameters file not found. Using default parameters.")
         if symbol in best_params_data:
             # Use the latest best parameters for this symbol
             params = best_params_data[symbol]['best_params']
@@ -319,24 +733,12 @@ def run_backtest(symbol: str,
 
     # Get symbol configuration
     symbol_config = TRADING_SYMBOLS[symbol]
-    yf_symbol = symbol_config['yfinance']
-
-    # Handle crypto symbols with forward slashes
-    if '/' in yf_symbol:
-        yf_symbol = yf_symbol.replace('/', '-')
-
-    # Calculate date range
-    end_date = datetime.now(pytz.UTC)
-    # Round down end_date to the nearest minute to avoid potential future timestamps
-    end_date = end_date.replace(second=0, microsecond=0)
-    start_date = end_date - timedelta(days=days + 2)  # Add buffer days
 
-    # Fetch historical data
-    ticker = yf.Ticker(yf_symbol)
-    data = ticker.history(start=start_date,
-                          end=end_date,
-                          interval=symbol_config.get('interval', DEFAULT_INTERVAL),
-                          actions=True)
+    # Fetch historical data unless the caller already supplied it
+    if provided_data is not None:
+        data = provided_data.copy()
+    else:
+        data = _fetch_symbol_history(symbol, days)
 
     if len(data) == 0:
         raise ValueError(
@@ -347,8 +749,7 @@ def run_backtest(symbol: str,
         data.index = data.index.tz_localize('UTC')
 
     # Filter for market hours
-    data = data[data.index.map(
-        lambda x: is_market_hours(x, symbol_config['market_hours']))]
+    data = _filter_market_hours(data, symbol_config['market_hours'])
     data.columns = data.columns.str.lower()
 
     # Generate signals using the provided parameters
@@ -356,12 +757,6 @@ def run_backtest(symbol: str,
 
     # Initialize portfolio tracking
     initial_capital = 100000  # $100k initial capital
-    position = 0  # Current position in shares
-    cash = initial_capital
-    portfolio_value = [initial_capital]  # Start with initial capital
-    shares = [0]  # Start with no shares
-    trades = []  # Track individual trades
-    total_position_value = 0  # Track total position value for position sizing
 
     # Get trading costs based on market type
     market_type = symbol_config['market']
@@ -369,266 +764,122 @@ def run_backtest(symbol: str,
     trading_fee = costs['trading_fee']
     spread = costs['spread']
 
-    # Simulate trading
-    for i in range(len(data)):
-        current_price = data['close'].iloc[i]
-        current_time = data.index[i]
-
-        # Update total position value
-        total_position_value = position * current_price
-
-        if i > 0:  # Skip first bar for signal processing
-            signal = signals['signal'].iloc[i]
-
-            # Process signals
-            if signal == 1:  # Buy signal
-                # Calculate performance ranking
-                perf_rankings = calculate_performance_ranking(
-                    prices_dataset, current_time, lookback_days_param)
-
-                if perf_rankings is not None and symbol in perf_rankings.index:
-                    # Get percentile rank (0 to 1)
-                    rank = perf_rankings.loc[symbol, 'rank']
-                    performance = perf_rankings.loc[symbol, 'performance']
-
-                    # Calculate buy percentage using new dynamic formula
-                    def calculate_buy_percentage(rank: int,
-                                                  total_assets: int) -> float:
-                        """
-                        Calculate buy percentage based on rank and total number of assets.
-                        rank: 1 is best performer, total_assets is worst performer
-                        Returns: float between 0.0 and 0.2 representing buy percentage
-                        """
-                        # Calculate cutoff points
-                        bottom_third = int(total_assets * (1 / 3))
-                        top_two_thirds = total_assets - bottom_third
-
-                        # If in bottom third, buy 0%
-                        if rank > top_two_thirds:
-                            return 0.0
-
-                        # For top two-thirds, use inverted wave function
-                        x = (rank - 1) / (top_two_thirds - 1)
-                        wave = 0.02 * np.sin(
-                            2 * np.pi * x)  # Smaller oscillation
-                        linear = 0.48 - 0.48 * x  # Linear decrease from 0.18 to 0.0
-                        return max(0.0, min(0.5, linear + wave))  # Clamp between 0.0 and 0.2
-
-                    # Get total number of assets
-                    total_assets = len(perf_rankings)
-
-                    # Calculate buy percentage using new dynamic formula
-                    rank = 1 + sum(
-                        1 for other_metric in perf_rankings['rank'].values
-                        if other_metric > rank)
-                    buy_percentage = calculate_buy_percentage(rank, total_assets)
-
-                    # Calculate position size as percentage of initial capital
-                    capital_to_use = initial_capital * buy_percentage
-                    shares_to_buy = capital_to_use / current_price
-
-                    print(f"\nBuy Decision:")
-                    print(f"Rank: {rank:.2f}")
-                    print(f"Buy Percentage: {buy_percentage*100:.1f}%")
-                    print(
-                        f"Current position: {position:.8f} shares at ${current_price:.2f}"
-                    )
-                    print(
-                        f"Buying {shares_to_buy:.8f} shares at ${current_price:.2f}"
-                    )
-
-                    # Round based on market type
-                    if symbol_config['market'] == 'CRYPTO':
-                        shares_to_buy = round(shares_to_buy, 8)
-                    else:
-                        shares_to_buy = int(shares_to_buy)
-
-                    # Ensure minimum position size
-                    min_qty = 1 if symbol_config[
-                        'market'] != 'CRYPTO' else 0.0001
-                    if shares_to_buy < min_qty:
-                        shares_to_buy = min_qty
-
-                    cost = shares_to_buy * current_price
-                    # Apply trading costs to buy (full spread + fee)
-                    total_cost = cost * (1 + spread + trading_fee)
-
-                    if total_cost <= cash and shares_to_buy > 0:  # Check if we have enough cash and shares to buy
-                        position += shares_to_buy  # Add to existing position
-                        cash -= total_cost
-                        trades.append({
-                            'time': current_time,
-                            'type': 'buy',
-                            'price': current_price,
-                            'shares': shares_to_buy,
-                            'value': cost,
-                            'total_cost': total_cost,
-                            'trading_costs': total_cost - cost,
-                            'total_position': position
-                        })
-                        print(f"Remaining cash: ${cash:.2f}")
-
-            elif signal == -1 and position > 0:  # Sell signal
-                print(f"\n{'='*80}")
-                print(f"SELL SIGNAL detected for {symbol} at {current_time}")
-                print(
-                    f"Current position: {position:.8f} shares at ${current_price:.2f}"
-                )
+    is_crypto = symbol_config['market'] == 'CRYPTO'
+    min_qty = 0.0001 if is_crypto else 1
+
+    # Convert the price/signal columns to NumPy once for the jitted loop
+    close_arr = data['close'].to_numpy(dtype=np.float64)
+    signal_arr = signals['signal'].to_numpy(dtype=np.int8)
+    n_bars = len(data)
+
+    # Precompute the ranking-driven buy/sell percentages for each signal bar;
+    # calculate_performance_ranking stays in Python, the hot loop does not
+    buy_pct = np.zeros(n_bars)
+    sell_pct = np.zeros(n_bars)
+    has_rank = np.zeros(n_bars, dtype=np.bool_)
+    rank_arr = np.zeros(n_bars)
+    for i in range(1, n_bars):
+        sig = signal_arr[i]
+        if sig == 0:
+            continue
 
-                # Calculate performance ranking
-                perf_rankings = calculate_performance_ranking(
-                    prices_dataset, current_time, lookback_days_param)
-
-                if perf_rankings is not None and symbol in perf_rankings.index:
-                    # Get percentile rank (0 to 1)
-                    rank = perf_rankings.loc[symbol, 'rank']
-                    performance = perf_rankings.loc[symbol, 'performance']
-
-                    # Calculate sell percentage using new dynamic formula
-                    def calculate_sell_percentage(rank: int,
-                                                  total_assets: int) -> float:
-                        """
-                        Calculate sell percentage based on rank and total number of assets.
-                        rank: 1 is best performer, total_assets is worst performer
-                        Returns: float between 0.1 and 1.0 representing sell percentage
-                        """
-                        # Calculate cutoff points
-                        bottom_third = int(total_assets * (1 / 3))
-                        top_two_thirds = total_assets - bottom_third
-
-                        # If in bottom third, sell 100%
-                        if rank > top_two_thirds:
-                            return 1.0
-
-                        # For top two-thirds, use a wave function
-                        x = (rank - 1) / (top_two_thirds - 1)
-                        wave = 0.1 * np.sin(
-                            2 * np.pi * x)  # Oscillation between -0.1 and 0.1
-                        linear = 0.3 + 0.7 * x  # Linear increase from 0.3 to 1.0
-                        return max(0.1, min(1.0, linear +
-                                            wave))  # Clamp between 0.1 and 1.0
-
-                    # Get total number of assets
-                    total_assets = len(perf_rankings)
-
-                    # Calculate sell percentage using new dynamic formula
-                    rank = 1 + sum(
-                        1 for other_metric in perf_rankings['rank'].values
-                        if other_metric > rank)
-                    sell_percentage = calculate_sell_percentage(
-                        rank, total_assets)
-
-                    # Calculate shares to sell
-                    shares_to_sell = position * sell_percentage
+        # Calculate performance ranking
+        perf_rankings = calculate_performance_ranking(
+            prices_dataset, data.index[i], lookback_days_param)
 
-                    # Round based on market type
-                    if symbol_config['market'] == 'CRYPTO':
-                        shares_to_sell = round(shares_to_sell, 8)
-                    else:
-                        shares_to_sell = int(shares_to_sell)
+        if perf_rankings is not None and symbol in perf_rankings.index:
+            # Get percentile rank (0 to 1)
+            rank = perf_rankings.loc[symbol, 'rank']
+            total_assets = len(perf_rankings)
 
-                    print(f"\nSell Decision:")
-                    print(f"Performance: {performance:.2f}%")
-                    print(f"Rank: {rank:.2f}")
-                    print(f"Sell Percentage: {sell_percentage*100:.1f}%")
-                    print(
-                        f"Shares to sell: {shares_to_sell:.8f} out of {position:.8f}"
-                    )
+            # Convert percentile to an integer rank (1 = best performer)
+            rank = 1 + sum(1 for other_metric in perf_rankings['rank'].values
+                           if other_metric > rank)
+            has_rank[i] = True
+            rank_arr[i] = rank
 
-                    if shares_to_sell > 0:
-                        # Calculate sale value with trading costs (half spread + fee since we're already at bid)
-                        gross_sale_value = shares_to_sell * current_price
-                        trading_costs = gross_sale_value * (trading_fee +
-                                                            spread / 2)
-                        net_sale_value = gross_sale_value - trading_costs
-
-                        cash += net_sale_value
-                        position -= shares_to_sell
-                        trades.append({
-                            'time': current_time,
-                            'type': 'sell',
-                            'price': current_price,
-                            'shares': shares_to_sell,
-                            'gross_value': gross_sale_value,
-                            'value': net_sale_value,
-                            'trading_costs': trading_costs,
-                            'total_position': position,
-                            'performance_rank': rank,
-                            'sell_percentage': sell_percentage * 100
-                        })
-                        print(
-                            f"Trade executed: Sold {shares_to_sell:.8f} shares at ${current_price:.2f}"
-                        )
-                        print(
-                            f"Gross value: ${gross_sale_value:.2f}, Trading costs: ${trading_costs:.2f}"
-                        )
-                        print(f"Net value: ${net_sale_value:.2f}")
-                        print(f"Remaining position: {position:.8f} shares")
-                else:
-                    # Fallback to selling entire position if we can't calculate ranking
-                    gross_sale_value = position * current_price
-                    trading_costs = gross_sale_value * (trading_fee +
-                                                        spread / 2)
-                    net_sale_value = gross_sale_value - trading_costs
-                    cash += net_sale_value
-                    trades.append({
-                        'time': current_time,
-                        'type': 'sell',
-                        'price': current_price,
-                        'shares': position,
-                        'gross_value': gross_sale_value,
-                        'value': net_sale_value,
-                        'trading_costs': trading_costs,
-                        'total_position': 0,
-                        'performance_rank': None,
-                        'sell_percentage': 100
-                    })
-                    print(
-                        "\nWARNING: Could not calculate rankings, selling entire position"
-                    )
-                    print(
-                        f"Sold all {position:.8f} shares at ${current_price:.2f}"
-                    )
-                    position = 0
+            if sig == 1:
+                buy_pct[i] = calculate_buy_percentage(rank, total_assets)
+            else:
+                sell_pct[i] = calculate_sell_percentage(rank, total_assets)
 
-        # Update portfolio value and shares owned after processing any trades
-        current_value = cash + (position * current_price)
-        portfolio_value.append(current_value)
-        shares.append(position)
+    # Simulate trading
+    (portfolio_value_arr, shares_arr, trade_idx, trade_type, trade_shares,
+     trade_value, trade_gross, trade_total_cost, trade_costs,
+     trade_position) = _simulate_loop(close_arr, signal_arr, buy_pct,
+                                      sell_pct, has_rank,
+                                      float(initial_capital), trading_fee,
+                                      spread, is_crypto, float(min_qty))
+
+    # Keep the preallocated float64 buffers from the kernel - downstream
+    # slicing and stats work on them zero-copy instead of re-boxing every
+    # value into a Python list
+    portfolio_value = portfolio_value_arr
+    shares = shares_arr
+
+    # Rebuild the trades list-of-dicts from the parallel trade-log arrays
+    trades = []
+    for k in range(len(trade_idx)):
+        i = int(trade_idx[k])
+        current_time = data.index[i]
+        if trade_type[k] == 1:
+            trades.append({
+                'time': current_time,
+                'type': 'buy',
+                'price': close_arr[i],
+                'shares': trade_shares[k],
+                'value': trade_value[k],
+                'total_cost': trade_total_cost[k],
+                'trading_costs': trade_costs[k],
+                'total_position': trade_position[k]
+            })
+        else:
+            trades.append({
+                'time': current_time,
+                'type': 'sell',
+                'price': close_arr[i],
+                'shares': trade_shares[k],
+                'gross_value': trade_gross[k],
+                'value': trade_value[k],
+                'trading_costs': trade_costs[k],
+                'total_position': trade_position[k],
+                'performance_rank': rank_arr[i] if has_rank[i] else None,
+                'sell_percentage':
+                sell_pct[i] * 100 if has_rank[i] else 100
+            })
 
     # Calculate final portfolio value
-    final_value = cash + (position * data['close'].iloc[-1])
+    final_value = portfolio_value[-1]
     total_return = ((final_value - initial_capital) / initial_capital) * 100
 
     # Calculate performance metrics
     if trades:
-        trades_df = pd.DataFrame(trades)
-        if len(trades_df) > 0:
-            # Separate buy and sell trades
-            buy_trades = trades_df[trades_df['type'] == 'buy']
-            sell_trades = trades_df[trades_df['type'] == 'sell']
-
-            # Calculate profits only if we have matching buy/sell pairs
-            if len(buy_trades) > 0 and len(sell_trades) > 0:
-                # Take the minimum length to ensure we only compare complete trades
-                min_trades = min(len(buy_trades), len(sell_trades))
-                profits = sell_trades[
-                    'value'].iloc[:min_trades].values - buy_trades[
-                        'total_cost'].iloc[:min_trades].values
-                win_rate = (len(profits[profits > 0]) /
-                            len(profits)) * 100 if len(profits) > 0 else 0
-            else:
-                win_rate = 0
-
-        # Calculate max drawdown
-        portfolio_series = pd.Series(portfolio_value)
-        rolling_max = portfolio_series.expanding().max()
-        drawdowns = (portfolio_series - rolling_max) / rolling_max * 100
+        # Pair buys with sells directly from the trade-log arrays - no
+        # intermediate DataFrames needed just to subtract two value arrays
+        buy_mask = trade_type == 1
+        buy_costs = trade_total_cost[buy_mask]
+        sell_values = trade_value[~buy_mask]
+
+        # Calculate profits only if we have matching buy/sell pairs
+        min_trades = min(len(buy_costs), len(sell_values))
+        if min_trades > 0:
+            profits = sell_values[:min_trades] - buy_costs[:min_trades]
+            win_rate = (float((profits > 0).sum()) / min_trades) * 100
+        else:
+            win_rate = 0
+
+        # Calculate max drawdown - one C-level pass over the value array
+        # instead of a Pandas expanding window
+        pv = portfolio_value_arr
+        rolling_max = np.maximum.accumulate(pv)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            drawdowns = np.nan_to_num((pv - rolling_max) / rolling_max * 100)
         max_drawdown = abs(drawdowns.min())
 
         # Calculate Sharpe Ratio
         # Convert portfolio values to returns
-        returns = pd.Series(portfolio_value).pct_change().dropna()
+        with np.errstate(divide='ignore', invalid='ignore'):
+            returns = np.nan_to_num(np.diff(pv) / pv[:-1])
 
         # Annualize the risk-free rate (2%)
         annual_rf_rate = 0.02
@@ -642,8 +893,8 @@ def run_backtest(symbol: str,
         # For 5-minute data, multiply by sqrt(252 * 24 * 12) to annualize
         if len(returns) > 1:  # Need at least 2 points for std calculation
             annualization_factor = np.sqrt(252 * 24 * 12)  # For 5-minute data
-            sharpe_ratio = annualization_factor * (excess_returns.mean() /
-                                                   excess_returns.std())
+            sharpe_ratio = annualization_factor * (
+                excess_returns.mean() / excess_returns.std(ddof=1))
         else:
             sharpe_ratio = 0
     else:
@@ -687,12 +938,10 @@ def calculate_performance_ranking(prices_dataset, current_time, lookback_days_pa
     )
     print(f"{'-'*10:<10} {'-'*12:>12} {'-'*12:>12} {'-'*12:>12} {'-'*10:>10}")
 
-    # Try to load best_params.json for strategy performance data
-    best_params_data = {}
-    try:
-        with open("best_params.json", "r") as f:
-            best_params_data = json.load(f)
-    except (FileNotFoundError, json.JSONDecodeError):
+    # Try to load best_params.json for strategy performance data (cached on
+    # mtime - this runs once per signal bar during a backtest)
+    best_params_data = load_best_params_data()
+    if not best_params_data:
         print("Warning: Could not load best_params.json or file is invalid")
 
     for symbol, data in prices_dataset.items():
@@ -763,21 +1012,11 @@ def calculate_performance_ranking(prices_dataset, current_time, lookback_days_pa
 
 def split_into_sessions(data):
     """Split data into continuous market sessions"""
-    sessions = []
-    current_session = []
-
-    for idx, row in data.iterrows():
-        if not current_session or (idx - current_session[-1].name
-                                   ).total_seconds() <= 300:  # 5 minutes
-            current_session.append(row)
-        else:
-            sessions.append(pd.DataFrame(current_session))
-            current_session = [row]
-
-    if current_session:
-        sessions.append(pd.DataFrame(current_session))
-
-    return sessions
+    # A gap of more than 5 minutes starts a new session; a vectorized diff +
+    # groupby replaces the old per-row iterrows loop
+    diffs = data.index.to_series().diff().dt.total_seconds().fillna(0)
+    session_id = (diffs > 300).cumsum()
+    return [group for _, group in data.groupby(session_id, sort=False)]
 
 
 def create_backtest_plot(backtest_result: dict) -> tuple:
@@ -806,19 +1045,19 @@ def create_backtest_plot(backtest_result: dict) -> tuple:
                          color='blue',
                          alpha=0.7,
                          linewidth=2,
-                         label='Price')
+                         label='Price',
+                         rasterized=True)
     
     # Plot volume
     volume_data = data['volume'].rolling(window=5).mean()
     ax1_volume.fill_between(data.index,
                             volume_data,
                             color='gray',
-                            alpha=0.3)
+                            alpha=0.3,
+                            rasterized=True)
     
-    # Create timestamp mapping for signals
-    original_to_shifted = {}
-    for orig_time in signals.index:
-        original_to_shifted[orig_time] = orig_time
+    # Timestamps are plotted unshifted here, so the signal mapping is the
+    # identity - no per-timestamp dict needed
 
     # Plot signals with correct timestamps
     buy_signals = signals[signals['signal'] == 1]
@@ -832,16 +1071,17 @@ def create_backtest_plot(backtest_result: dict) -> tuple:
         if len(signals_df) > 0:
             signals_df = signals_df.copy()
             signals_df['close'] = data.loc[signals_df.index, 'close']
-            shifted_indices = [
-                original_to_shifted[idx] for idx in signals_df.index
-            ]
+            shifted_indices = signals_df.index
             ax1.scatter(shifted_indices,
                         signals_df['close'],
                         color=color,
                         marker=marker,
                         s=100)
 
-            for idx, shifted_idx in zip(signals_df.index, shifted_indices):
+            # Each annotate call allocates a Text artist and costs a layout
+            # pass on save - cap the price labels at the last 50 signals
+            for idx, shifted_idx in list(zip(signals_df.index,
+                                             shifted_indices))[-50:]:
                 ax1.annotate(f'${signals_df.loc[idx, "close"]:.2f}',
                              (shifted_idx, signals_df.loc[idx, 'close']),
                              xytext=(0, offset),
@@ -892,24 +1132,28 @@ def create_backtest_plot(backtest_result: dict) -> tuple:
     ax2.plot(daily_data.index,
              daily_data['Composite'],
              color='blue',
-             label='Daily Composite')
+             label='Daily Composite',
+             rasterized=True)
     ax2.plot(daily_data.index,
              daily_data['Up_Lim'],
              '--',
              color='green',
              alpha=0.6,
-             label='Upper Limit')
+             label='Upper Limit',
+             rasterized=True)
     ax2.plot(daily_data.index,
              daily_data['Down_Lim'],
              '--',
              color='red',
              alpha=0.6,
-             label='Lower Limit')
+             label='Lower Limit',
+             rasterized=True)
     ax2.fill_between(daily_data.index,
                      daily_data['Up_Lim'],
                      daily_data['Down_Lim'],
                      color='gray',
-                     alpha=0.1)
+                     alpha=0.1,
+                     rasterized=True)
     
     ax2.set_title('Daily Composite Indicator')
     ax2.legend()
@@ -924,24 +1168,28 @@ def create_backtest_plot(backtest_result: dict) -> tuple:
     ax3.plot(weekly_data.index,
              weekly_data['Composite'],
              color='purple',
-             label='Weekly Composite')
+             label='Weekly Composite',
+             rasterized=True)
     ax3.plot(weekly_data.index,
              weekly_data['Up_Lim'],
              '--',
              color='green',
              alpha=0.6,
-             label='Upper Limit')
+             label='Upper Limit',
+             rasterized=True)
     ax3.plot(weekly_data.index,
              weekly_data['Down_Lim'],
              '--',
              color='red',
              alpha=0.6,
-             label='Lower Limit')
+             label='Lower Limit',
+             rasterized=True)
     ax3.fill_between(weekly_data.index,
                      weekly_data['Up_Lim'],
                      weekly_data['Down_Lim'],
                      color='gray',
-                     alpha=0.1)
+                     alpha=0.1,
+                     rasterized=True)
     
     ax3.set_title('Weekly Composite Indicator')
     ax3.legend()
@@ -971,14 +1219,16 @@ def create_backtest_plot(backtest_result: dict) -> tuple:
     ax4.plot(portfolio_df.index,
              portfolio_df['value'],
              color='green',
-             label='Portfolio Value')
+             label='Portfolio Value',
+             rasterized=True)
     
     # Plot shares
     ax4_shares.plot(portfolio_df.index,
                     portfolio_df['shares'],
                     color='blue',
                     alpha=0.5,
-                    label='Shares')
+                    label='Shares',
+                    rasterized=True)
     
     ax4.set_title('Portfolio Value and Position Size')
     ax4.set_ylabel('Portfolio Value ($)')
@@ -991,7 +1241,7 @@ def create_backtest_plot(backtest_result: dict) -> tuple:
 
     # Save plot to bytes
     buf = io.BytesIO()
-    plt.savefig(buf, format='png', dpi=300, bbox_inches='tight')
+    plt.savefig(buf, format='png', dpi=150, bbox_inches='tight')
     plt.close()
     buf.seek(0)
 
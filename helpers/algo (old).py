@@ -66,16 +66,24 @@ async def run_strategy():
 
 async def main():
     """Start the bot and strategy"""
+    strategy_task = None
     try:
         # Start the bot (this will handle command registration internally)
         await telegram_bot.start()
-        
-        # Start the strategy loop
-        await run_strategy()
-        
+
+        # Run the strategy loop as a supervised task so errors and
+        # cancellation propagate cleanly alongside the polling updater
+        strategy_task = asyncio.create_task(run_strategy())
+        await asyncio.gather(strategy_task)
+
     except Exception as e:
         logger.error(f"Error in main: {str(e)}")
         raise
+    finally:
+        # Cancel the strategy loop so its long sleeps don't block shutdown
+        if strategy_task is not None:
+            strategy_task.cancel()
+            await asyncio.gather(strategy_task, return_exceptions=True)
 
 if __name__ == "__main__":
     asyncio.run(main())
@@ -81,61 +81,114 @@ def calculate_stochastic(data: pd.DataFrame, k_period: int = 14, d_period: int =
     d = k.rolling(window=d_period).mean()
     return k - d  # Similar to MACD, we return K-D
 
-def calculate_composite_indicator(data: pd.DataFrame, params: Dict[str, Union[float, int]], reactivity: float = 1.0, is_weekly: bool = False) -> Tuple[pd.DataFrame, pd.Series, pd.Series]:
+# Cache of computed indicator components keyed on the data window and the
+# non-weight parameters - the composite is a pure linear combination of the
+# components, so sweeping the weights axis can reuse them
+_components_cache = {}
+_COMPONENTS_CACHE_MAX = 8
+
+def _data_fingerprint(data: pd.DataFrame) -> tuple:
+    """Cheap fingerprint of a price window, stable across DataFrame copies."""
+    return (len(data), str(data.index[0]), str(data.index[-1]),
+            float(data['close'].iloc[0]), float(data['close'].iloc[-1]))
+
+def compute_components(data: pd.DataFrame, params: Dict[str, Union[float, int]]) -> Dict[str, pd.Series]:
+    """Compute the normalized indicator components behind the composite.
+
+    These depend only on the non-weight parameters (MACD/RSI/Stochastic
+    periods and the fractal settings), so results are memoized and shared
+    across weight combinations during a grid search.
+    """
+    key = (_data_fingerprint(data),
+           params['fractal_window'], tuple(params['fractal_lags']),
+           params['macd_fast'], params['macd_slow'], params['macd_signal'],
+           params['rsi_period'], params['stochastic_k_period'],
+           params['stochastic_d_period'])
+    cached = _components_cache.get(key)
+    if cached is not None:
+        return cached
+
     # Calculate fractal complexity
     complexity = calculate_fractal_complexity(data, lags=params['fractal_lags'], window=params['fractal_window'])
-    
+
     # Print input data stats for debugging
-    print(f"Debug: calculate_composite_indicator input stats:")
+    print(f"Debug: compute_components input stats:")
     print(f"Data points: {len(data)}")
     print(f"Date range: {data.index[0]} to {data.index[-1]}")
-    
+
     # Calculate indicators
     macd = calculate_macd(data, fast=params['macd_fast'], slow=params['macd_slow'], signal=params['macd_signal'])
     rsi = calculate_rsi(data, period=params['rsi_period'])
     stoch = calculate_stochastic(data, k_period=params['stochastic_k_period'], d_period=params['stochastic_d_period'])
-    
+
     # Print indicator stats
     print(f"MACD range: {macd.min():.4f} to {macd.max():.4f}")
     print(f"RSI range: {rsi.min():.4f} to {rsi.max():.4f}")
     print(f"Stochastic range: {stoch.min():.4f} to {stoch.max():.4f}")
-    
+
     # Handle NaN values safely
     macd = macd.fillna(0)
     rsi = rsi.fillna(50)  # Neutral RSI value
     stoch = stoch.fillna(0)
-    
+
     # Normalize each indicator with safe division
     norm_macd = macd / (macd.std() if macd.std() != 0 else 1)
     norm_rsi = (rsi - 50) / 25  # Center around 0 and scale
     norm_stoch = stoch / (100 if stoch.max() != 0 else 1)  # Scale to [-1, 1]
-    
+
     # Normalize fractal complexity
     norm_complexity = (complexity - complexity.mean()) / (complexity.std() if complexity.std() != 0 else 1)
-    
+
     # Print normalized stats
     print(f"Normalized MACD range: {norm_macd.min():.4f} to {norm_macd.max():.4f}")
     print(f"Normalized RSI range: {norm_rsi.min():.4f} to {norm_rsi.max():.4f}")
     print(f"Normalized Stoch range: {norm_stoch.min():.4f} to {norm_stoch.max():.4f}")
     print(f"Fractal complexity range: {complexity.min():.4f} to {complexity.max():.4f}")
     print(f"Normalized complexity range: {norm_complexity.min():.4f} to {norm_complexity.max():.4f}")
-    
+
+    components = {
+        'macd': norm_macd,
+        'rsi': norm_rsi,
+        'stoch': norm_stoch,
+        'complexity': norm_complexity
+    }
+
+    if len(_components_cache) >= _COMPONENTS_CACHE_MAX:
+        _components_cache.pop(next(iter(_components_cache)))
+    _components_cache[key] = components
+    return components
+
+def apply_weights(components: Dict[str, pd.Series], weights_matrix) -> np.ndarray:
+    """Evaluate the composite for K weight rows in one matrix product.
+
+    ``weights_matrix`` has shape (K, 4) with columns ordered
+    (macd, rsi, stoch, complexity); returns an (N, K) array of composites.
+    """
+    component_matrix = np.column_stack([
+        components['macd'].to_numpy(),
+        components['rsi'].to_numpy(),
+        components['stoch'].to_numpy(),
+        components['complexity'].to_numpy()
+    ])
+    return component_matrix @ np.asarray(weights_matrix, dtype=float).T
+
+def calculate_composite_indicator(data: pd.DataFrame, params: Dict[str, Union[float, int]], reactivity: float = 1.0, is_weekly: bool = False) -> Tuple[pd.DataFrame, pd.Series, pd.Series]:
+    # Compute (or reuse) the normalized indicator components
+    components = compute_components(data, params)
+
    # Extract weights from params
-    weights = params.get('weights', {'macd_weight': 0.25, 'rsi_weight': 0.25, 'stoch_weight': 0.25, 'complexity_weight': 0.25, 
+    weights = params.get('weights', {'macd_weight': 0.25, 'rsi_weight': 0.25, 'stoch_weight': 0.25, 'complexity_weight': 0.25,
                                      'weekly_macd_weight': 0.25, 'weekly_rsi_weight': 0.25, 'weekly_stoch_weight': 0.25, 'weekly_complexity_weight': 0.25})
 
     # Combine indicators with weighted approach
     if is_weekly:
-        composite = (weights['weekly_macd_weight'] * norm_macd + 
-                     weights['weekly_rsi_weight'] * norm_rsi + 
-                     weights['weekly_stoch_weight'] * norm_stoch + 
-                     weights['weekly_complexity_weight'] * norm_complexity)
+        weight_row = [weights['weekly_macd_weight'], weights['weekly_rsi_weight'],
+                      weights['weekly_stoch_weight'], weights['weekly_complexity_weight']]
     else:
-        composite = (weights['macd_weight'] * norm_macd + 
-                     weights['rsi_weight'] * norm_rsi + 
-                     weights['stoch_weight'] * norm_stoch + 
-                     weights['complexity_weight'] * norm_complexity)
+        weight_row = [weights['macd_weight'], weights['rsi_weight'],
+                      weights['stoch_weight'], weights['complexity_weight']]
 
+    composite = pd.Series(apply_weights(components, [weight_row])[:, 0], index=data.index)
     composite = composite.fillna(0)
     
     # Calculate the rolling standard deviation for thresholds
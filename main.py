@@ -115,8 +115,9 @@ async def run_bot():
                                 logger.error(error_msg)
                                 await trading_bot.send_message(f"❌ {error_msg}")
                                 
-                            # Small delay between symbols to prevent overload
-                            await asyncio.sleep(1)
+                            # Yield between symbols; sleep(0) gives other tasks
+                            # a turn without a timer-wheel insertion
+                            await asyncio.sleep(0)
                     except Exception as e:
                         logger.error(f"Error in backtest for {symbol}: {str(e)}")
                         continue
@@ -189,8 +190,9 @@ Bar Time: {analysis['bar_time']}
                         # Update last check time for this symbol
                         symbol_last_check[symbol] = current_time
                         
-                        # Small delay between symbols to prevent overload
-                        await asyncio.sleep(1)
+                        # Yield between symbols; sleep(0) gives other tasks
+                        # a turn without a timer-wheel insertion
+                        await asyncio.sleep(0)
                         
                     except Exception as e:
                         logger.error(f"Error processing {symbol}: {str(e)}")
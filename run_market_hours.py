@@ -1,14 +1,20 @@
 import asyncio
 import datetime
-import pytz
+import random
+import time
+from zoneinfo import ZoneInfo
 from trading import TradingExecutor
+from utils import get_api_symbol
 from fetch import fetch_historical_data, get_latest_data, is_market_open
 from strategy import TradingStrategy
 from telegram_bot import TradingBot
 from alpaca.trading.client import TradingClient
 import os
 from dotenv import load_dotenv
+import atexit
 import logging
+import queue
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
 from telegram import Update, Bot
 from backtest_individual import find_best_params
 from config import TRADING_SYMBOLS, param_grid, lookback_days_param
@@ -36,66 +42,255 @@ flask_thread = threading.Thread(target=run_flask, daemon=True)
 flask_thread.start()
 
 
-# Set up logging
+# Set up logging. Records are pushed onto an in-memory queue and written by a
+# background listener thread, so logger calls on the event loop never block on
+# file or console I/O.
+class _BufferedRotatingFileHandler(RotatingFileHandler):
+    """Rotating file handler that batches records through a 64 KiB buffer.
+
+    Skipping the per-record flush collapses many log lines into one write()
+    syscall; a background timer and close() still bound how long records can
+    sit in the buffer.
+    """
+
+    def _open(self):
+        return open(self.baseFilename, self.mode, buffering=65536,
+                    encoding=self.encoding)
+
+    def flush(self):
+        # Per-record flushing defeats the buffer; flushing happens on the
+        # periodic timer below and on close()
+        pass
+
+def _flush_log_periodically(handler, interval=5.0):
+    """Flush the buffered log handler every few seconds from a daemon thread"""
+    while True:
+        time.sleep(interval)
+        stream = handler.stream
+        if stream is not None:
+            try:
+                stream.flush()
+            except ValueError:  # Stream closed during shutdown
+                return
+
+_log_formatter = logging.Formatter('%(asctime)s - %(levelname)s - %(message)s')
+_file_handler = _BufferedRotatingFileHandler(
+    'trading.log', maxBytes=50 * 1024 * 1024, backupCount=5, delay=True)
+_file_handler.setFormatter(_log_formatter)
+threading.Thread(
+    target=_flush_log_periodically, args=(_file_handler,), daemon=True).start()
+atexit.register(_file_handler.close)
+_stream_handler = logging.StreamHandler()
+_stream_handler.setFormatter(_log_formatter)
+
+_log_queue = queue.Queue(-1)
+_log_listener = QueueListener(
+    _log_queue, _file_handler, _stream_handler, respect_handler_level=True
+)
+_log_listener.start()
+atexit.register(_log_listener.stop)
+
 logging.basicConfig(
     level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler('trading.log'),
-        logging.StreamHandler()
-    ]
+    handlers=[QueueHandler(_log_queue)]
 )
 logger = logging.getLogger(__name__)
 
+# Load and validate the environment once at import so misconfiguration fails
+# fast at startup instead of minutes into the event loop, and so a supervisor
+# re-entering run_bot() doesn't reparse the .env file every time
+try:
+    load_dotenv()
+except Exception as e:
+    logger.warning("Could not load .env file: %s", e)
+
+_REQUIRED_VARS = ['ALPACA_API_KEY', 'ALPACA_SECRET_KEY', 'TELEGRAM_BOT_TOKEN', 'CHAT_ID', 'BOT_PASSWORD', 'TRADE_HISTORY_FILE']
+_missing_vars = [var for var in _REQUIRED_VARS if not os.getenv(var)]
+
+if _missing_vars:
+    _error_msg = f"DEPLOYMENT ERROR: Missing required environment variables: {', '.join(_missing_vars)}"
+    logger.error(_error_msg)
+    # Send emergency notification if possible before failing
+    try:
+        if 'TELEGRAM_BOT_TOKEN' not in _missing_vars and 'CHAT_ID' not in _missing_vars:
+            asyncio.run(Bot(token=os.getenv('TELEGRAM_BOT_TOKEN')).send_message(
+                chat_id=os.getenv('CHAT_ID'),
+                text=f"🚨 {_error_msg}"
+            ))
+    except Exception as e:
+        logger.error("Failed to send emergency notification: %s", e)
+
+    raise ValueError(_error_msg)
+
+# The client is stateless apart from its credentials - build it once
+_TRADING_CLIENT = TradingClient(
+    os.getenv('ALPACA_API_KEY'),
+    os.getenv('ALPACA_SECRET_KEY')
+)
+
+# Resolve the market timezone once per process - this sits on the timer hot
+# path. zoneinfo is C-backed and, unlike pytz, makes .replace() arithmetic
+# on aware datetimes DST-correct.
+_ET = ZoneInfo('America/New_York')
+
+# Per-day cache of the aware open/close datetimes so repeat checks within the
+# same trading day cost a dict lookup instead of two datetime constructions
+_BOUNDS_CACHE = {}
+
+def _market_bounds(now):
+    """Return (market_start, market_end) for now's calendar date, cached per day"""
+    bounds = _BOUNDS_CACHE.get(now.date())
+    if bounds is None:
+        bounds = (
+            now.replace(hour=7, minute=30, second=0, microsecond=0),
+            now.replace(hour=22, minute=0, second=0, microsecond=0),
+        )
+        # Drop stale days so the cache stays bounded
+        for cached_date in list(_BOUNDS_CACHE):
+            if (now.date() - cached_date).days > 2:
+                del _BOUNDS_CACHE[cached_date]
+        _BOUNDS_CACHE[now.date()] = bounds
+    return bounds
+
+# Today's trading window as epoch seconds: (valid_until, open, close, weekday)
+_FAST_WINDOW = None
+
 def is_market_hours():
     """Check if it's currently market hours (9:30 AM - 4:00 PM Eastern, Monday-Friday)"""
-    et_tz = pytz.timezone('US/Eastern')
-    now = datetime.datetime.now(et_tz)
-    
-    # Check if it's a weekday
-    if now.weekday() >= 5:  # 5 = Saturday, 6 = Sunday
+    global _FAST_WINDOW
+    t = time.time()
+    if _FAST_WINDOW is None or t >= _FAST_WINDOW[0]:
+        # Refresh once per ET day; until then the check is two float compares
+        now = datetime.datetime.now(_ET)
+        market_start, market_end = _market_bounds(now)
+        next_midnight = (now + datetime.timedelta(days=1)).replace(
+            hour=0, minute=0, second=0, microsecond=0)
+        _FAST_WINDOW = (
+            next_midnight.timestamp(),
+            market_start.timestamp(),
+            market_end.timestamp(),
+            now.weekday() < 5,
+        )
+
+    _, open_ts, close_ts, is_weekday = _FAST_WINDOW
+    return is_weekday and open_ts <= t <= close_ts
+
+def next_market_event(now=None):
+    """Return (is_open_now, seconds_until_transition) for market hours.
+
+    Computes the exact delay until the next open or close so callers can
+    sleep once instead of waking on a fixed polling interval.
+    """
+    et_tz = _ET
+    if now is None:
+        now = datetime.datetime.now(et_tz)
+    else:
+        now = now.astimezone(et_tz)
+
+    market_start, market_end = _market_bounds(now)
+
+    if now.weekday() < 5 and market_start <= now <= market_end:
+        return True, (market_end - now).total_seconds()
+
+    # Closed: advance to the next weekday open
+    candidate = now
+    if now >= market_end or now.weekday() >= 5:
+        candidate = candidate + datetime.timedelta(days=1)
+    while candidate.weekday() >= 5:  # Skip Saturday/Sunday
+        candidate = candidate + datetime.timedelta(days=1)
+    next_open = candidate.replace(hour=7, minute=30, second=0, microsecond=0)
+
+    return False, max(0.0, (next_open - now).total_seconds())
+
+async def _market_clock(market_open: asyncio.Event):
+    """Set the event at market open and clear it at close.
+
+    Sleeps the exact delta to the next transition, so waiters wake
+    edge-triggered instead of polling the clock.
+    """
+    while True:
+        is_open, seconds_until_transition = next_market_event()
+        if is_open:
+            if not market_open.is_set():
+                logger.info("Market open - waking trading loop")
+                market_open.set()
+        else:
+            if market_open.is_set():
+                market_open.clear()
+            logger.info("Market closed - next open in %.0fs", seconds_until_transition)
+        # Small grace so we land on the far side of the transition
+        await asyncio.sleep(seconds_until_transition + 1)
+
+def _seconds_to_next_bar(period=300):
+    """Seconds until just after the next period-aligned bar close.
+
+    The +1 grace margin gives the data feed a moment to finalize the bar
+    before we fetch it.
+    """
+    return period - (int(time.time()) % period) + 1
+
+def _run_stream(stream):
+    """Run a data stream forever, reconnecting with capped exponential backoff"""
+    backoff = 1
+    while True:
+        try:
+            stream.run()
+            backoff = 1
+        except Exception as e:
+            logger.error("Bar stream error: %s", e)
+        time.sleep(backoff * (0.8 + 0.4 * random.random()))
+        backoff = min(backoff * 2, 300)
+
+def _start_bar_stream(bars_q, loop):
+    """Subscribe to Alpaca's bar WebSocket and push wake signals into bars_q.
+
+    Streams run on daemon threads with their own event loops; completed bars
+    are handed to the main loop thread-safely. Returns True when at least one
+    stream was started, False when streaming isn't available so callers can
+    stay on the timer-based cadence.
+    """
+    try:
+        from alpaca.data.live import CryptoDataStream, StockDataStream
+    except ImportError:
+        logger.info("alpaca.data.live not available - using timer-based bar cadence")
         return False
-    
-    # Market hours are 9:30 AM - 4:00 PM Eastern
-    market_start = now.astimezone(et_tz).replace(hour=7, minute=30, second=0, microsecond=0)
-    market_end = now.astimezone(et_tz).replace(hour=22, minute=0, second=0, microsecond=0)
-    
-    return market_start <= now.astimezone(et_tz) <= market_end
+
+    def _notify():
+        # Coalesce: one pending wake signal is enough
+        if bars_q.empty():
+            bars_q.put_nowait(True)
+
+    async def _on_bar(bar):
+        # Runs on the stream thread's loop; hand off to the main loop
+        loop.call_soon_threadsafe(_notify)
+
+    crypto_symbols = [get_api_symbol(s) for s, cfg in TRADING_SYMBOLS.items()
+                      if cfg['market'] == 'CRYPTO']
+    stock_symbols = [get_api_symbol(s) for s, cfg in TRADING_SYMBOLS.items()
+                     if cfg['market'] != 'CRYPTO']
+
+    streams = []
+    if crypto_symbols:
+        crypto_stream = CryptoDataStream(os.getenv('ALPACA_API_KEY'), os.getenv('ALPACA_SECRET_KEY'))
+        crypto_stream.subscribe_bars(_on_bar, *crypto_symbols)
+        streams.append(crypto_stream)
+    if stock_symbols:
+        stock_stream = StockDataStream(os.getenv('ALPACA_API_KEY'), os.getenv('ALPACA_SECRET_KEY'))
+        stock_stream.subscribe_bars(_on_bar, *stock_symbols)
+        streams.append(stock_stream)
+
+    for stream in streams:
+        threading.Thread(target=_run_stream, args=(stream,), daemon=True).start()
+
+    logger.info("Streaming bars for %d crypto and %d stock symbols", len(crypto_symbols), len(stock_symbols))
+    return bool(streams)
 
 async def run_bot():
     """Main function to run the trading bot"""
-    # Try to load from .env file, but continue if file not found
-    try:
-        load_dotenv()
-    except Exception as e:
-        logger.warning(f"Could not load .env file: {e}")
-    
-    # Check for required environment variables
-    required_vars = ['ALPACA_API_KEY', 'ALPACA_SECRET_KEY', 'TELEGRAM_BOT_TOKEN', 'CHAT_ID', 'BOT_PASSWORD', 'TRADE_HISTORY_FILE']
-    missing_vars = [var for var in required_vars if not os.getenv(var)]
-    
-    if missing_vars:
-        error_msg = f"DEPLOYMENT ERROR: Missing required environment variables: {', '.join(missing_vars)}"
-        logger.error(error_msg)
-        # Send emergency notification if possible before failing
-        try:
-            if 'TELEGRAM_BOT_TOKEN' not in missing_vars and 'CHAT_ID' not in missing_vars:
-                bot = Bot(token=os.getenv('TELEGRAM_BOT_TOKEN'))
-                asyncio.create_task(bot.send_message(
-                    chat_id=os.getenv('CHAT_ID'),
-                    text=f"🚨 DEPLOYMENT ERROR: Missing environment variables: {', '.join(missing_vars)}"
-                ))
-        except Exception as e:
-            logger.error(f"Failed to send emergency notification: {e}")
-            
-        raise ValueError(error_msg)
-    
-    # Initialize clients
-    trading_client = TradingClient(
-        os.getenv('ALPACA_API_KEY'),
-        os.getenv('ALPACA_SECRET_KEY')
-    )
-    
+    # Environment is loaded and validated at import; reuse the shared client
+    trading_client = _TRADING_CLIENT
+
+
     # Initialize strategies for each symbol
     symbols = list(TRADING_SYMBOLS.keys())
     strategies = {symbol: TradingStrategy(symbol) for symbol in symbols}
@@ -125,6 +320,7 @@ async def run_bot():
 
     async def backtest_loop():
         """Background task for running backtests"""
+        backoff = 300
         while True:
             try:
                 for symbol in TRADING_SYMBOLS:
@@ -139,14 +335,14 @@ async def run_bot():
                                     days_since_update = (datetime.datetime.now() - last_update).days
                                     needs_update = days_since_update >= 7  # Update weekly
                         except (FileNotFoundError, json.JSONDecodeError, KeyError) as e:
-                            logger.warning(f"Could not read best_params.json for {symbol}: {str(e)}")
+                            logger.warning("Could not read best_params.json for %s: %s", symbol, e)
                             needs_update = True
                             
                         if needs_update:
-                            logger.info(f"Running backtest for {symbol}...")
+                            logger.info("Running backtest for %s...", symbol)
                             await trading_bot.send_message(f"🔄 Running background optimization for {symbol}...")
                             try:
-                                logger.info(f"Starting optimization for {symbol} with param_grid: {param_grid}")
+                                logger.info("Starting optimization for %s with param_grid: %s", symbol, param_grid)
                                 # Run the CPU-intensive backtest in a thread pool
                                 loop = asyncio.get_event_loop()
                                 best_params = await loop.run_in_executor(
@@ -158,45 +354,52 @@ async def run_bot():
                                 )
                                 
                                 if best_params:
-                                    logger.info(f"Successfully found best params for {symbol}: {best_params}")
+                                    logger.info("Successfully found best params for %s: %s", symbol, best_params)
                                     await trading_bot.send_message(f"✅ Optimization complete for {symbol}")
-                                    logger.info(f"New optimal parameters for {symbol}: {best_params}")
+                                    logger.info("New optimal parameters for %s: %s", symbol, best_params)
                                 else:
                                     error_msg = f"Failed to find best parameters for {symbol} - no valid results returned"
                                     logger.error(error_msg)
                                     await trading_bot.send_message(f"❌ {error_msg}")
                             except Exception as e:
                                 error_msg = f"Failed to optimize {symbol}: {str(e)}"
-                                logger.error(f"Full optimization error for {symbol}: {str(e)}", exc_info=True)
+                                logger.error("Full optimization error for %s: %s", symbol, e, exc_info=True)
                                 await trading_bot.send_message(f"❌ {error_msg}")
-                                input("Press Enter to continue...")
-                            # Small delay between symbols to prevent overload
-                            await asyncio.sleep(1)
+                            # Yield between symbols; sleep(0) gives other tasks
+                            # a turn without a timer-wheel insertion
+                            await asyncio.sleep(0)
                     except Exception as e:
-                        logger.error(f"Error in backtest for {symbol}: {str(e)}")
+                        logger.error("Error in backtest for %s: %s", symbol, e)
                         continue
                 
                 # Sleep for 1 hour before checking again
+                backoff = 300
                 await asyncio.sleep(3600)
+            except asyncio.CancelledError:
+                raise
             except Exception as e:
-                logger.error(f"Error in backtest loop: {str(e)}")
-                await asyncio.sleep(300)  # Wait 5 minutes before retrying
+                logger.error("Error in backtest loop: %s", e)
+                # Jittered exponential backoff so a persistent failure
+                # doesn't retry on a fixed schedule forever
+                await asyncio.sleep(backoff * (0.8 + 0.4 * random.random()))
+                backoff = min(backoff * 2, 900)
     
-    async def trading_loop():
+    async def trading_loop(market_open: asyncio.Event, bars_q: asyncio.Queue):
         """Background task for trading logic"""
         symbol_last_check = {symbol: None for symbol in symbols}
-        
+        backoff = 60
+
         while True:
             try:
-                current_time = datetime.datetime.now(pytz.UTC)
-                
-                for symbol in symbols:
+                # Block cheaply until the market clock flips the event at the
+                # open instead of waking on a polling interval
+                await market_open.wait()
+
+                current_time = datetime.datetime.now(datetime.timezone.utc)
+
+                async def process_symbol(symbol):
+                    """Run one symbol's signal check and any resulting trade"""
                     try:
-                        # Check if 5 minutes have passed since last check for this symbol
-                        if (symbol_last_check[symbol] is not None and 
-                            (current_time - symbol_last_check[symbol]).total_seconds() < 300):
-                            continue
-                            
                         # Generate signals
                         try:
                             with open("best_params.json", "r") as f:
@@ -210,7 +413,7 @@ async def run_bot():
                         except FileNotFoundError:
                             print("Best parameters file not found. Using default parameters.")
                             params = get_default_params()
-                        
+
                         try:
                             analysis = strategies[symbol].analyze()
                             if analysis and analysis['signal'] != 0:  # If there's a trading signal
@@ -225,7 +428,7 @@ Parameters: {params}
 Bar Time: {analysis['bar_time']}
                                 """
                                 await trading_bot.send_message(message)
-                           
+
                                 # Execute trade with notifications through telegram bot
                                 action = "BUY" if analysis['signal'] == 1 else "SELL"
                                 await trading_executors[symbol].execute_trade(
@@ -233,49 +436,76 @@ Bar Time: {analysis['bar_time']}
                                     analysis=analysis,
                                     notify_callback=trading_bot.send_message
                                 )
-                                
+
                                 # Run and send backtest results
                                 await run_and_send_backtest(symbol, trading_bot)
-                                
+
                         except Exception as e:
-                            logger.error(f"Error analyzing {symbol}: {str(e)}")
-                            continue
-                            
+                            logger.error("Error analyzing %s: %s", symbol, e)
+                            return
+
                         # Update last check time for this symbol
                         symbol_last_check[symbol] = current_time
-                        
-                        # Small delay between symbols to prevent overload
-                        await asyncio.sleep(1)
-                        
+
                     except Exception as e:
-                        logger.error(f"Error processing {symbol}: {str(e)}")
-                        continue
-                
-                # Calculate time to sleep until next check
-                elapsed_time = (datetime.datetime.now(pytz.UTC) - current_time).total_seconds()
-                sleep_time = max(60, 300 - elapsed_time)  # At least 1 minute, at most 5 minutes
-                await asyncio.sleep(sleep_time)
+                        logger.error("Error processing %s: %s", symbol, e)
+
+                # Only symbols whose 5-minute window has elapsed are due. The
+                # margin below 300 absorbs wakeup jitter now that iterations
+                # fire on bar boundaries, so a symbol can't skip a whole bar.
+                due_symbols = [
+                    symbol for symbol in symbols
+                    if (symbol_last_check[symbol] is None or
+                        (current_time - symbol_last_check[symbol]).total_seconds() >= 290)
+                ]
+
+                # Dispatch all due symbols at once so their network
+                # roundtrips overlap instead of running back to back
+                if due_symbols:
+                    await asyncio.gather(*(process_symbol(symbol) for symbol in due_symbols))
                 
+                # Wake on the next streamed bar when the WebSocket is up;
+                # the 5-minute boundary timer remains as the fallback cadence
+                try:
+                    await asyncio.wait_for(bars_q.get(), timeout=_seconds_to_next_bar())
+                except asyncio.TimeoutError:
+                    pass
+                backoff = 60
+
+            except asyncio.CancelledError:
+                raise
             except Exception as e:
-                logger.error(f"Error in trading loop: {str(e)}")
-                await asyncio.sleep(60)  # Wait a minute before retrying
+                logger.error("Error in trading loop: %s", e)
+                # Jittered exponential backoff so an outage doesn't get
+                # hammered with fixed-interval retries
+                await asyncio.sleep(backoff * (0.8 + 0.4 * random.random()))
+                backoff = min(backoff * 2, 900)
 
-    logger.info(f"Bot started, monitoring symbols: {', '.join(symbols)}")
+    logger.info("Bot started, monitoring symbols: %s", ', '.join(symbols))
     
     try:
-        # Start both the trading and backtest loops
-        trading_task = asyncio.create_task(trading_loop())
+        # Start the market clock plus the trading and backtest loops
+        market_open = asyncio.Event()
+        bars_q = asyncio.Queue(maxsize=64)
+        _start_bar_stream(bars_q, asyncio.get_running_loop())
+        clock_task = asyncio.create_task(_market_clock(market_open))
+        trading_task = asyncio.create_task(trading_loop(market_open, bars_q))
         backtest_task = asyncio.create_task(backtest_loop())
-        
-        # Keep the main task running
-        while True:
-            await asyncio.sleep(1)
-            
+
+        # Supervise the tasks: if any of them dies, the exception surfaces
+        # here immediately instead of when the task is garbage collected,
+        # and it replaces the old wake-every-second keep-alive loop
+        await asyncio.gather(clock_task, trading_task, backtest_task)
+
+    except asyncio.CancelledError:
+        raise
     except Exception as e:
-        logger.error(f"Error in main loop: {str(e)}")
+        logger.error("Error in main loop: %s", e)
     finally:
         # Cleanup
         tasks_to_cancel = []
+        if 'clock_task' in locals():
+            tasks_to_cancel.append(clock_task)
         if 'trading_task' in locals():
             tasks_to_cancel.append(trading_task)
         if 'backtest_task' in locals():
@@ -328,7 +558,7 @@ async def send_stop_notification(reason: str):
                 text=f"🔴 Trading program stopped: {reason}"
             )
         except Exception as e:
-            logger.error(f"Failed to send Telegram notification: {e}")
+            logger.error("Failed to send Telegram notification: %s", e)
 
 if __name__ == "__main__":
     # Check deployment environment first
@@ -340,7 +570,15 @@ if __name__ == "__main__":
             sys.exit(1)
     except ImportError:
         logger.warning("Deployment environment checker not found. Continuing without check.")
-    
+
+    # Prefer the libuv-backed event loop when available; fall back silently
+    # on platforms where uvloop isn't installed
+    try:
+        import uvloop
+        uvloop.install()
+    except ImportError:
+        pass
+
     try:
         asyncio.run(run_bot())
     except KeyboardInterrupt:
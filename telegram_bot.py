@@ -1,25 +1,119 @@
 import os
 from datetime import datetime
 import logging
-from telegram import Bot, Update, InlineKeyboardButton, InlineKeyboardMarkup
+from telegram import Bot, Update, InlineKeyboardButton, InlineKeyboardMarkup, InputMediaPhoto
 from telegram.ext import Application, CommandHandler, ContextTypes, CallbackQueryHandler
+from telegram.request import HTTPXRequest
 from strategy import TradingStrategy
 from alpaca.trading.client import TradingClient
-from visualization import create_strategy_plot, create_multi_symbol_plot
 from config import TRADING_SYMBOLS, default_backtest_interval, PER_SYMBOL_CAPITAL_MULTIPLIER
 from trading import TradingExecutor
-from backtest import run_portfolio_backtest, create_portfolio_backtest_plot, create_portfolio_with_prices_plot
-from backtest_individual import run_backtest, create_backtest_plot
-from portfolio import get_portfolio_history, create_portfolio_plot
-import pandas as pd
-import pytz
 from utils import get_api_symbol, get_display_symbol
+
+# visualization, backtest, backtest_individual and portfolio pull in
+# matplotlib and friends; they are imported lazily inside the commands
+# that need them so bot startup doesn't pay for plotting machinery
 import asyncio
+import functools
+import hashlib
+import io
 import json
+import operator
+import pickle
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+try:
+    import orjson
+
+    def _json_loads(data):
+        return orjson.loads(data)
+except ImportError:  # orjson is optional - fall back to the stdlib
+    def _json_loads(data):
+        return json.loads(data)
 
 logger = logging.getLogger(__name__)
 
+# On-disk cache of portfolio backtest results so repeating
+# /backtest portfolio with the same horizon on the same day skips the
+# whole simulation; same best-effort layout as the yfinance Parquet cache
+_BT_CACHE_DIR = os.path.join('.cache', 'bt')
+_BT_CACHE_TTL = 3600
+
+
+def _bt_cache_path(key):
+    name = hashlib.md5(repr(key).encode()).hexdigest()
+    return os.path.join(_BT_CACHE_DIR, f"{name}.pkl")
+
+
+def _read_bt_cache(key):
+    """Load a cached backtest result from disk if present and fresh, else None."""
+    path = _bt_cache_path(key)
+    try:
+        if time.time() - os.path.getmtime(path) > _BT_CACHE_TTL:
+            return None
+        with open(path, 'rb') as f:
+            return pickle.load(f)
+    except (OSError, EOFError, pickle.PickleError, AttributeError):
+        # Missing file or a corrupt/stale entry - just re-run
+        return None
+
+
+def _write_bt_cache(key, result):
+    try:
+        os.makedirs(_BT_CACHE_DIR, exist_ok=True)
+        with open(_bt_cache_path(key), 'wb') as f:
+            pickle.dump(result, f, protocol=pickle.HIGHEST_PROTOCOL)
+    except (OSError, pickle.PickleError):
+        pass  # disk cache is best-effort
+
+# /open argument shape: one precompiled match replaces the arg-count,
+# float() and sign checks (symbols may contain '/' or '-', e.g. BTC/USD)
+_OPEN_RE = re.compile(r'^([A-Za-z0-9/\-]{1,12}) ([0-9]+(?:\.[0-9]+)?)$')
+
+# Single-worker pool for matplotlib renders: pyplot keeps global state,
+# so figures must be drawn one at a time even when queued ahead
+_PLOT_POOL = ThreadPoolExecutor(max_workers=1, thread_name_prefix="plot")
+
+
+@functools.lru_cache(maxsize=64)
+def _buy_markup(backtest_type, days):
+    """Inline 'buy this allocation' keyboard, built once per (type, days)"""
+    return InlineKeyboardMarkup([[
+        InlineKeyboardButton(
+            "Buy this allocation",
+            callback_data=f"buy_backtest:{backtest_type}:{days}"
+        )
+    ]])
+
 class TradingBot:
+    # Signal labels indexed by classification code; see signals_command
+    _SIGNAL_TABLE = ("NEUTRAL", "WEAK SELL", "WEAK BUY", "STRONG SELL", "STRONG BUY")
+
+    # Backtest summary templates bound once at class definition; the
+    # format calls below just fill the pre-parsed templates
+    _SUMMARY_TMPL = (
+        "📊 Portfolio Backtest Results ({days} days)\n\n"
+        "Initial Capital: ${initial_capital:,.2f}\n"
+        "Final Value: ${final_value:,.2f}\n"
+        "Total Return: {total_return:.2f}%\n"
+        "Max Drawdown: {max_drawdown:.2f}%\n"
+        "Capital Multiplier: {capital_multiplier:.2f}\n"
+        "💰 Trading Costs: ${trading_costs:.2f}\n"
+        "💵 Cash Allocation: {cash_allocation:.1f}%\n"
+    ).format
+    _TURNOVER_TMPL = (
+        "\n🔄 Portfolio Turnover: {turnover:.1%}\n"
+        "📊 Trades: {total_trades} (Buy: {buy_trades}, Sell: {sell_trades})\n"
+        "💰 Total Buy Value: ${total_buy_value:,.2f}\n"
+        "💰 Total Sell Value: ${total_sell_value:,.2f}\n"
+        "📦 Avg Buy Size: ${avg_buy_size:,.2f}\n"
+        "📦 Avg Sell Size: ${avg_sell_size:,.2f}\n\n"
+    ).format
+    _RETURN_LINE_TMPL = "{sym}: {ret:.2f}% (Allocation: {alloc:.1f}%)\n".format
+    _ALLOC_LINE_TMPL = "{sym}: {alloc:.1f}%\n".format
+
     def __init__(self, trading_client: TradingClient, strategies: dict, symbols: list):
         self.trading_client = trading_client
         self.strategies = strategies  # Dict of symbol -> TradingStrategy
@@ -34,23 +128,109 @@ class TradingBot:
             
         # Initialize trading executors for each symbol
         self.executors = {symbol: TradingExecutor(trading_client, symbol) for symbol in symbols}
-            
+
+        # Display-symbol -> Alpaca API symbol, computed once; the mapping
+        # never changes at runtime
+        self._api_symbol = {symbol: get_api_symbol(symbol) for symbol in symbols}
+
+        # Frozenset alongside the ordered list for O(1) membership tests
+        self._symbol_set = frozenset(symbols)
+
+        # Backtest value-column names, fixed for the bot's lifetime
+        self._value_cols = [f'{s}_value' for s in symbols]
+
+        # Static market classification, lifted out of the command paths
+        self._crypto_symbols = frozenset(
+            s for s in symbols if TRADING_SYMBOLS[s]['market'] == 'CRYPTO')
+
+        # In-memory cache of best_params.json, refreshed only when the file
+        # mtime changes so per-symbol lookups don't re-read and re-parse it
+        self._params_cache = {}
+        self._params_mtime = None
+
+        # Short-lived account cache so commands that loop over symbols
+        # reuse one equity snapshot instead of one REST call per symbol
+        self._account_cache = None
+        self._account_time = 0.0
+
+        # Time-bounded memo of analyze() results keyed by symbol, so
+        # bursts of commands share one indicator computation
+        self._analysis_cache = {}
+
+        # Shared process pool for CPU-bound work (backtest simulations),
+        # sidestepping the GIL; workers spawn on first submit, so
+        # constructing it here is cheap. Plot rendering stays on the
+        # thread-based _PLOT_POOL (pyplot state, and buffers would have
+        # to be pickled back), and run_portfolio_backtest stays on a
+        # thread because its progress callback cannot cross a process
+        # boundary.
+        self._cpu_pool = ProcessPoolExecutor(
+            max_workers=min(8, os.cpu_count() or 1, len(symbols) or 1))
+
+        # Progress-edit coalescing state; see _update_backtest_progress
+        self._progress_latest = None
+        self._progress_pending = False
+
         # Initialize the application and bot
         self.application = Application.builder().token(self.bot_token).build()
         self._bot = None  # Will be initialized in start()
         self.setup_handlers(self.application)
             
-    def get_best_params(self, symbol):
-            """Get best parameters for a symbol from JSON file"""
+    def _load_all_params(self):
+        """Return the cached best-params dict for all symbols, refreshing on mtime change"""
+        try:
+            mtime = os.stat("best_params.json").st_mtime
+        except OSError:
+            return {}
+
+        if mtime != self._params_mtime:
             try:
-                with open("best_params.json", "r") as f:
-                    best_params_data = json.load(f)
-                if symbol in best_params_data:
-                    return best_params_data[symbol]['best_params']
-                else:
-                    return "Using default parameters"
-            except FileNotFoundError:
-                return "Using default parameters"
+                with open("best_params.json", "rb") as f:
+                    self._params_cache = _json_loads(f.read())
+                self._params_mtime = mtime
+            except (OSError, ValueError):
+                return {}
+
+        return self._params_cache
+
+    def _get_account(self):
+        """Get the Alpaca account, cached for a couple of seconds"""
+        now = time.monotonic()
+        if self._account_cache is None or now - self._account_time > 2.0:
+            self._account_cache = self.trading_client.get_account()
+            self._account_time = now
+        return self._account_cache
+
+    async def _cached_analysis(self, sym, ttl=2.0):
+        """Run strategies[sym].analyze() off the event loop, memoized for ttl seconds"""
+        now = time.monotonic()
+        cached = self._analysis_cache.get(sym)
+        if cached is not None and now - cached[0] < ttl:
+            return cached[1]
+        analysis = await asyncio.get_running_loop().run_in_executor(
+            None, self.strategies[sym].analyze)
+        self._analysis_cache[sym] = (now, analysis)
+        return analysis
+
+    def get_best_params(self, symbol):
+        """Get best parameters for a symbol from JSON file"""
+        entry = self._load_all_params().get(symbol)
+        if entry:
+            return entry['best_params']
+        return "Using default parameters"
+
+    @staticmethod
+    def _position_floats(position):
+        """Parse a position's numeric string fields into floats once for reuse"""
+        return {
+            'mv': float(position.market_value),
+            'pl': float(position.unrealized_pl),
+            'plpc': float(position.unrealized_plpc),
+            'entry': float(position.avg_entry_price),
+            'cur': float(position.current_price),
+            'qty': position.qty,
+            'side': position.side.upper(),
+        }
 
     def setup_handlers(self, application: Application):
         """Setup all command handlers"""
@@ -75,11 +255,29 @@ class TradingBot:
         # Add callback query handler for inline buttons
         application.add_handler(CallbackQueryHandler(self.button_callback))
 
+        # One central error handler instead of a try/except wrapper in
+        # every command body
+        application.add_error_handler(self._on_error)
+
+    async def _on_error(self, update, context):
+        """Report an unhandled command error back to the chat"""
+        logger.error(f"Command error: {context.error}")
+        if update is not None and getattr(update, 'message', None):
+            try:
+                await update.message.reply_text(f"❌ Error: {context.error}")
+            except Exception:
+                pass  # the report itself failing shouldn't crash the dispatcher
+
     @property
     def bot(self):
         """Lazy initialization of bot instance"""
         if self._bot is None:
-            self._bot = Bot(token=self.bot_token)
+            # Persistent pooled HTTPX client so consecutive sends reuse a
+            # warm TLS connection instead of renegotiating per message
+            self._bot = Bot(
+                token=self.bot_token,
+                request=HTTPXRequest(connection_pool_size=8)
+            )
         return self._bot
 
     async def start(self):
@@ -88,7 +286,9 @@ class TradingBot:
             # Initialize the application
             await self.application.initialize()
             await self.application.start()
-            await self.application.updater.start_polling()
+            # Long-poll with a 30s timeout so idle polling holds one
+            # connection open instead of hammering getUpdates
+            await self.application.updater.start_polling(poll_interval=1.0, timeout=30)
             
             # Send startup message
             await self.send_message("🤖 Trading Bot started successfully!")
@@ -116,18 +316,51 @@ class TradingBot:
         except Exception as e:
             logger.error(f"Error stopping bot: {e}")
             
+    @staticmethod
+    def _pack_chunks(message: str, limit: int = 4096):
+        """Split a message into chunks under Telegram's limit on newline boundaries.
+
+        Fragments are accumulated until adding the next line would overflow,
+        so a message slightly over the limit becomes two well-formed chunks
+        instead of one chunk plus a few stray characters.
+        """
+        if len(message) <= limit:
+            return [message]
+
+        chunks = []
+        current = []
+        current_len = 0
+        for line in message.split('\n'):
+            line_len = len(line) + 1  # +1 for the rejoining newline
+            if current and current_len + line_len > limit:
+                chunks.append('\n'.join(current))
+                current = []
+                current_len = 0
+            while len(line) > limit:  # Pathologically long single line
+                chunks.append(line[:limit])
+                line = line[limit:]
+                line_len = len(line) + 1
+            current.append(line)
+            current_len += line_len
+        if current:
+            chunks.append('\n'.join(current))
+        return chunks
+
     async def send_message(self, message: str):
         """Send message to Telegram"""
         try:
-            # Split message into chunks of 4096 characters (Telegram's limit)
-            chunks = [message[i:i+4096] for i in range(0, len(message), 4096)]
-            for chunk in chunks:
-                await self.bot.send_message(
+            # Split message into chunks within 4096 characters (Telegram's limit)
+            chunks = self._pack_chunks(message)
+            # Pipeline multi-chunk sends over the pooled connection
+            await asyncio.gather(*(
+                self.bot.send_message(
                     chat_id=self.chat_id,
                     text=chunk,
                     parse_mode='HTML',  # Enable HTML formatting
                     disable_web_page_preview=True  # Disable link previews
                 )
+                for chunk in chunks
+            ))
         except Exception as e:
             logger.error(f"Failed to send Telegram message: {e}")
 
@@ -141,9 +374,9 @@ class TradingBot:
         except Exception as e:
             logger.error(f"Failed to send Telegram photo: {e}")
             
-    async def start_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
-        """Start the bot and show available commands"""
-        commands = """
+    # Static help text built once at class definition instead of on every
+    # /start or /help invocation
+    _HELP_TEXT = """
 🤖 Multi-Symbol Trading Bot Commands:
 
 📊 Status Commands:
@@ -175,50 +408,74 @@ class TradingBot:
     • /portfolio 15Min 1D (15-min data for 1 day)
     • /portfolio 1D 3M (daily data for 3 months)
         """
+
+    async def _run_per_symbol(self, update, context, render_fn, empty_text):
+        """Fan ``render_fn`` out over the requested symbols and send the result.
+
+        ``render_fn(sym)`` is an async callable returning ``(message,
+        has_data)``. Sections are joined with dividers and coalesced into
+        as few Telegram messages as the length limit allows; ``empty_text``
+        is the reply when no symbol produced data.
+        """
+        symbol = context.args[0].upper() if context.args else None
+
+        if symbol and symbol not in self._symbol_set:
+            await update.message.reply_text(f"❌ Invalid symbol: {symbol}")
+            return
+
+        symbols_to_check = [symbol] if symbol else self.symbols
+
+        # Analyze all symbols concurrently, then stream the sections into
+        # one buffer instead of a list + join
+        results = await asyncio.gather(*(render_fn(sym) for sym in symbols_to_check))
+        buf = io.StringIO()
+        has_data = False
+        for msg, ok in results:
+            has_data = has_data or ok
+            if buf.tell():
+                buf.write("\n---\n")
+            buf.write(msg)
+        if buf.tell():
+            await self.send_message(buf.getvalue())
+
+        if not has_data:
+            await update.message.reply_text(empty_text)
+
+    async def start_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+        """Start the bot and show available commands"""
         symbols_list = "\n".join([f"• {symbol}" for symbol in self.symbols])
-        await update.message.reply_text(f"Trading bot started\nMonitoring the following symbols:\n{symbols_list}\n\n{commands}")
+        await update.message.reply_text(f"Trading bot started\nMonitoring the following symbols:\n{symbols_list}\n\n{self._HELP_TEXT}")
 
     async def status_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Get current status"""
         try:
-            # Check if a specific symbol was requested
-            symbol = context.args[0].upper() if context.args else None
-            
-            if symbol and symbol not in self.symbols:
-                await update.message.reply_text(f"❌ Invalid symbol: {symbol}")
-                return
-                
-            symbols_to_check = [symbol] if symbol else self.symbols
-            has_data = False
-            
-            # Process symbols in chunks of 3
-            for i in range(0, len(symbols_to_check), 3):
-                chunk_messages = []
-                chunk_symbols = symbols_to_check[i:i+3]
-                
-                for sym in chunk_symbols:
+            all_params = self._load_all_params()
+            loop = asyncio.get_running_loop()
+
+            async def render_status(sym):
+                """Build one symbol's status text; returns (message, has_data)"""
+                try:
+                    analysis = await self._cached_analysis(sym)
+                    if not analysis:
+                        return f"No data available for {sym}", False
+
+                    name = TRADING_SYMBOLS[sym]['name']
+                    position = "LONG" if self.strategies[sym].current_position == 1 else "SHORT" if self.strategies[sym].current_position == -1 else "NEUTRAL"
+
+                    # Get best parameters
+                    params = all_params.get(sym, {}).get('best_params', "Using default parameters")
+                    params_message = f"\nParameters: {params}"
+
+                    # Get position details if any
                     try:
-                        analysis = self.strategies[sym].analyze()
-                        if not analysis:
-                            chunk_messages.append(f"No data available for {sym}")
-                            continue
-                            
-                        has_data = True
-                        position = "LONG" if self.strategies[sym].current_position == 1 else "SHORT" if self.strategies[sym].current_position == -1 else "NEUTRAL"
-                        
-                        # Get best parameters
-                        params = self.get_best_params(sym)
-                        params_message = f"\nParameters: {params}"
+                        pos = await loop.run_in_executor(
+                            None, self.trading_client.get_open_position, self._api_symbol[sym])
+                        pos_pnl = f"P&L: ${float(pos.unrealized_pl):.2f} ({float(pos.unrealized_plpc)*100:.2f}%)"
+                    except Exception:
+                        pos_pnl = "No open position"
 
-                        # Get position details if any
-                        try:
-                            pos = self.trading_client.get_open_position(get_api_symbol(sym))
-                            pos_pnl = f"P&L: ${float(pos.unrealized_pl):.2f} ({float(pos.unrealized_plpc)*100:.2f}%)"
-                        except:
-                            pos_pnl = "No open position"
-                        
-                        chunk_messages.append(f"""
-📊 {sym} ({TRADING_SYMBOLS[sym]['name']}) Status:
+                    return f"""
+📊 {sym} ({name}) Status:
 Position: {position}
 Current Price: ${analysis['current_price']:.2f}
 {pos_pnl}
@@ -233,17 +490,14 @@ Indicators:
 
 Price Changes:
 • 5min: {analysis['price_change_5m']*100:.2f}%
-• 1hr: {analysis['price_change_1h']*100:.2f}%""")
-                    except Exception as e:
-                        chunk_messages.append(f"Error analyzing {sym}: {str(e)}")
-                
-                # Send this chunk of messages
-                if chunk_messages:
-                    await update.message.reply_text("\n---\n".join(chunk_messages))
-            
-            if not has_data:
-                await update.message.reply_text("❌ No data available for any symbol. The market may be closed or there might be connection issues.")
-                
+• 1hr: {analysis['price_change_1h']*100:.2f}%""", True
+                except Exception as e:
+                    return f"Error analyzing {sym}: {str(e)}", False
+
+            await self._run_per_symbol(
+                update, context, render_status,
+                "❌ No data available for any symbol. The market may be closed or there might be connection issues.")
+
         except Exception as e:
             await update.message.reply_text(f"❌ Error getting status: {str(e)}")
 
@@ -253,38 +507,57 @@ Price Changes:
             # Check if a specific symbol was requested
             symbol = context.args[0].upper() if context.args else None
             
-            if symbol and symbol not in self.symbols:
+            if symbol and symbol not in self._symbol_set:
                 await update.message.reply_text(f"❌ Invalid symbol: {symbol}")
                 return
                 
             symbols_to_check = [symbol] if symbol else self.symbols
-            
+
+            # One REST call for every open position instead of one per symbol
+            # (most of which would 404 for symbols without a position)
+            loop = asyncio.get_running_loop()
+            all_positions = {
+                p.symbol: p
+                for p in await loop.run_in_executor(None, self.trading_client.get_all_positions)
+            }
+
+            # Each position's string fields are float-parsed once and reused
+            # by the summary block below
+            parsed = {}
+
             # Process symbols in chunks of 3
             for i in range(0, len(symbols_to_check), 3):
                 chunk_messages = []
                 chunk_symbols = symbols_to_check[i:i+3]
-                
+
                 for sym in chunk_symbols:
+                    name = TRADING_SYMBOLS[sym]['name']
                     try:
-                        position = self.trading_client.get_open_position(get_api_symbol(sym))
+                        api_sym = self._api_symbol[sym]
+                        position = all_positions.get(api_sym)
+                        if position is None:
+                            raise ValueError(f"no position for {sym}")
+                        d = parsed.get(api_sym)
+                        if d is None:
+                            d = parsed[api_sym] = self._position_floats(position)
                         # Get account equity for exposure calculation
-                        account = self.trading_client.get_account()
+                        account = self._get_account()
                         equity = float(account.equity)
-                        market_value = float(position.market_value)
+                        market_value = d['mv']
                         exposure_percentage = (market_value / equity) * 100
                         
                         message = f"""
-📈 {sym} ({TRADING_SYMBOLS[sym]['name']}) Position Details:
-Side: {position.side.upper()}
-Quantity: {position.qty}
-Entry Price: ${float(position.avg_entry_price):.2f}
-Current Price: ${float(position.current_price):.2f}
+📈 {sym} ({name}) Position Details:
+Side: {d['side']}
+Quantity: {d['qty']}
+Entry Price: ${d['entry']:.2f}
+Current Price: ${d['cur']:.2f}
 Market Value: ${market_value:.2f}
 Account Exposure: {exposure_percentage:.2f}%
-Unrealized P&L: ${float(position.unrealized_pl):.2f} ({float(position.unrealized_plpc)*100:.2f}%)"""
+Unrealized P&L: ${d['pl']:.2f} ({d['plpc']*100:.2f}%)"""
                     except Exception as e:
-                        logger.error(f"Error getting position for {sym} (API symbol: {get_api_symbol(sym)}): {str(e)}")
-                        message = f"No open position for {sym} ({TRADING_SYMBOLS[sym]['name']})"
+                        logger.error(f"Error getting position for {sym} (API symbol: {self._api_symbol[sym]}): {str(e)}")
+                        message = f"No open position for {sym} ({name})"
                     chunk_messages.append(message)
                 
                 # Send this chunk of messages
@@ -294,44 +567,41 @@ Unrealized P&L: ${float(position.unrealized_pl):.2f} ({float(position.unrealized
             # Add summary of all positions if not looking at a specific symbol
             if not symbol:
                 try:
-                    account = self.trading_client.get_account()
+                    account = self._get_account()
                     equity = float(account.equity)
-                    total_market_value = 0
-                    total_pnl = 0
-                    positions_summary = []
-                    
-                    # Calculate totals and collect position details
+                    total_market_value = 0.0
+                    total_pnl = 0.0
+                    rows = []
+
+                    # Single pass over the positions already fetched above:
+                    # accumulate the totals and collect (|value|, symbol,
+                    # floats) tuples that sort without a key function
                     for sym in self.symbols:
                         try:
-                            position = self.trading_client.get_open_position(get_api_symbol(sym))
-                            market_value = float(position.market_value)
-                            total_market_value += market_value
-                            total_pnl += float(position.unrealized_pl)
-                            positions_summary.append({
-                                'symbol': sym,
-                                'market_value': market_value,
-                                'side': position.side.upper(),
-                                'qty': position.qty,
-                                'pnl': float(position.unrealized_pl)
-                            })
+                            api_sym = self._api_symbol[sym]
+                            position = all_positions.get(api_sym)
+                            if position is None:
+                                continue
+                            d = parsed.get(api_sym)
+                            if d is None:
+                                d = parsed[api_sym] = self._position_floats(position)
+                            total_market_value += d['mv']
+                            total_pnl += d['pl']
+                            rows.append((abs(d['mv']), sym, d))
                         except Exception:
                             continue
-                    
+
                     if total_market_value > 0:
                         total_exposure = (total_market_value / equity) * 100
-                        
+
                         # Sort positions by market value
-                        positions_summary.sort(key=lambda x: abs(x['market_value']), reverse=True)
-                        
-                        # Build positions text with weights
-                        positions_text = []
-                        for pos in positions_summary:
-                            weight = (abs(pos['market_value']) / total_market_value) * 100
-                            pnl_pct = (pos['pnl'] / abs(pos['market_value'])) * 100 if pos['market_value'] != 0 else 0
-                            positions_text.append(
-                                f"• {pos['symbol']}: {pos['side']} {pos['qty']} ({weight:.1f}% weight) | P&L: ${pos['pnl']:.2f} ({pnl_pct:.1f}%)"
-                            )
-                        
+                        rows.sort(key=lambda row: row[0], reverse=True)
+
+                        positions_text = "\n".join(
+                            f"• {sym}: {d['side']} {d['qty']} ({abs_mv / total_market_value * 100:.1f}% weight) | P&L: ${d['pl']:.2f} ({(d['pl'] / abs_mv * 100) if abs_mv else 0:.1f}%)"
+                            for abs_mv, sym, d in rows
+                        )
+
                         summary = f"""
 💼 Portfolio Summary:
 Total Position Value: ${total_market_value:.2f}
@@ -339,7 +609,7 @@ Total Account Exposure: {total_exposure:.2f}%
 Total Unrealized P&L: ${total_pnl:.2f}
 
 Open Positions:
-{chr(10).join(positions_text)}"""
+{positions_text}"""
                         await update.message.reply_text(summary)
                 except Exception as e:
                     logger.error(f"Error generating position summary: {str(e)}")
@@ -350,7 +620,7 @@ Open Positions:
     async def balance_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Check account balance"""
         try:
-            account = self.trading_client.get_account()
+            account = self._get_account()
             message = f"""
 💰 Account Balance:
 Cash: ${float(account.cash):.2f}
@@ -365,7 +635,7 @@ Today's P&L: ${float(account.equity) - float(account.last_equity):.2f}
     async def performance_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """View today's performance"""
         try:
-            account = self.trading_client.get_account()
+            account = self._get_account()
             today_pl = float(account.equity) - float(account.last_equity)
             today_pl_pct = (today_pl / float(account.last_equity)) * 100
             
@@ -382,34 +652,21 @@ Current Equity: ${float(account.equity):.2f}
     async def indicators_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """View current indicator values"""
         try:
-            # Check if a specific symbol was requested
-            symbol = context.args[0].upper() if context.args else None
-            
-            if symbol and symbol not in self.symbols:
-                await update.message.reply_text(f"❌ Invalid symbol: {symbol}")
-                return
-                
-            symbols_to_check = [symbol] if symbol else self.symbols
-            has_data = False
-            
-            # Process symbols in chunks of 3
-            for i in range(0, len(symbols_to_check), 3):
-                chunk_messages = []
-                chunk_symbols = symbols_to_check[i:i+3]
-                
-                for sym in chunk_symbols:
-                    try:
-                        analysis = self.strategies[sym].analyze()
-                        if not analysis:
-                            chunk_messages.append(f"No data available for {sym}")
-                            continue
-                        # Get best parameters
-                        params = self.get_best_params(sym)
-                        params_message = f"\nParameters: {params}"
+            all_params = self._load_all_params()
 
-                        has_data = True
-                        message = f"""
-📈 {sym} ({TRADING_SYMBOLS[sym]['name']}) Indicators:
+            async def render_indicators(sym):
+                """Build one symbol's indicator text; returns (message, has_data)"""
+                try:
+                    analysis = await self._cached_analysis(sym)
+                    if not analysis:
+                        return f"No data available for {sym}", False
+                    name = TRADING_SYMBOLS[sym]['name']
+                    # Get best parameters
+                    params = all_params.get(sym, {}).get('best_params', "Using default parameters")
+                    params_message = f"\nParameters: {params}"
+
+                    return f"""
+📈 {sym} ({name}) Indicators:
 
 Daily Composite: {analysis['daily_composite']:.4f}
 • Upper Limit: {analysis['daily_upper_limit']:.4f}
@@ -421,18 +678,14 @@ Weekly Composite: {analysis['weekly_composite']:.4f}
 
 Price Changes:
 • 5min: {analysis['price_change_5m']*100:.2f}%
-• 1hr: {analysis['price_change_1h']*100:.2f}%"""
-                        chunk_messages.append(message)
-                    except Exception as e:
-                        chunk_messages.append(f"Error analyzing {sym}: {str(e)}")
-                
-                # Send this chunk of messages
-                if chunk_messages:
-                    await update.message.reply_text("\n---\n".join(chunk_messages))
-            
-            if not has_data:
-                await update.message.reply_text("❌ No data available for any symbol. The market may be closed or there might be connection issues.")
-                
+• 1hr: {analysis['price_change_1h']*100:.2f}%""", True
+                except Exception as e:
+                    return f"Error analyzing {sym}: {str(e)}", False
+
+            await self._run_per_symbol(
+                update, context, render_indicators,
+                "❌ No data available for any symbol. The market may be closed or there might be connection issues.")
+
         except Exception as e:
             await update.message.reply_text(f"❌ Error getting indicators: {str(e)}")
 
@@ -448,7 +701,7 @@ Price Changes:
             
             if len(args) >= 1:
                 # First argument could be either symbol or days
-                if args[0].upper() in self.symbols:
+                if args[0].upper() in self._symbol_set:
                     # First arg is a symbol
                     symbols_to_plot = [args[0].upper()]
                     # Check if second arg is days
@@ -472,16 +725,31 @@ Price Changes:
             
             await update.message.reply_text(f"📊 Generating plots for the last {days} days...")
             
+            from visualization import create_strategy_plot
+
+            all_params = self._load_all_params()
+            loop = asyncio.get_running_loop()
+
+            # Queue every render up front on the plot pool so the next
+            # figure draws while the previous one uploads
+            render_futs = {
+                symbol: loop.run_in_executor(
+                    _PLOT_POOL, create_strategy_plot, symbol, days)
+                for symbol in symbols_to_plot
+            }
+
             # Generate and send plot for each symbol
+            upload_tasks = []
             for symbol in symbols_to_plot:
+                name = TRADING_SYMBOLS[symbol]['name']
                 # Get best parameters
-                params = self.get_best_params(symbol)
+                params = all_params.get(symbol, {}).get('best_params', "Using default parameters")
 
                 try:
-                    buf, stats = create_strategy_plot(symbol, days)
+                    buf, stats = await render_futs[symbol]
                     
                     stats_message = f"""
-📈 {symbol} ({TRADING_SYMBOLS[symbol]['name']}) Statistics ({days} days):
+📈 {symbol} ({name}) Statistics ({days} days):
 • Parameters: {params}
 
 • Trading Days: {stats['trading_days']}
@@ -490,16 +758,20 @@ Price Changes:
 • Sell Signals: {stats['sell_signals']}
 """
                     
-                    await update.message.reply_document(
+                    upload_tasks.append(asyncio.create_task(update.message.reply_document(
                         document=buf,
                         filename=f"{symbol}_strategy_{days}d.png",
                         caption=stats_message
-                    )
+                    )))
                 except Exception as e:
-                    logger.error(f"Error plotting {symbol}: {str(e)}")
-                    await update.message.reply_text(f"❌ Could not generate plot for {symbol}: {str(e)}")
-                    continue
-                    
+                    logger.error("Error plotting %s: %s", symbol, e)
+                    upload_tasks.append(asyncio.create_task(update.message.reply_text(
+                        f"❌ Could not generate plot for {symbol}: {str(e)}")))
+
+            if upload_tasks:
+                await asyncio.gather(*upload_tasks)
+
+
         except ValueError as e:
             await update.message.reply_text(f"❌ Invalid input: {str(e)}")
         except Exception as e:
@@ -509,69 +781,56 @@ Price Changes:
     async def signals_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """View latest signals for all symbols"""
         try:
-            # Check if a specific symbol was requested
-            symbol = context.args[0].upper() if context.args else None
-            
-            if symbol and symbol not in self.symbols:
-                await update.message.reply_text(f"❌ Invalid symbol: {symbol}")
-                return
-                
-            symbols_to_check = [symbol] if symbol else self.symbols
-            signal_messages = []
-            has_data = False
-            
-            # Process symbols in chunks of 3
-            for i in range(0, len(symbols_to_check), 3):
-                chunk_messages = []
-                chunk_symbols = symbols_to_check[i:i+3]
-                
-                for sym in chunk_symbols:
-                    try:
-                        analysis = self.strategies[sym].analyze()
-                        if not analysis:
-                            chunk_messages.append(f"No data available for {sym}")
-                            continue
-                            
-                        has_data = True
-                        # Get signal strength and direction
-                        signal_strength = abs(analysis['daily_composite'])
-                        strength_emoji = "🔥" if signal_strength > 0.8 else "💪" if signal_strength > 0.5 else "👍"
-                        signal_direction = "BUY" if analysis['daily_composite'] > 0 else "SELL"
-                        
-                        # Format time since last signal with signal type
-                        last_signal_info = "No signals generated yet"
-                        if analysis.get('last_signal_time') is not None:
-                            now = pd.Timestamp.now(tz=pytz.UTC)
-                            last_time = analysis['last_signal_time']
-                            time_diff = now - last_time
-                            hours = int(time_diff.total_seconds() / 3600)
-                            minutes = int((time_diff.total_seconds() % 3600) / 60)
-                            # Get the signal type from the stored composite value
-                            signal_type = "BUY" if analysis['daily_composite'] > 0 else "SELL"
-                            last_signal_info = f"Last {signal_type} signal {strength_emoji}: {last_time.strftime('%Y-%m-%d %H:%M')} UTC ({hours}h {minutes}m ago)"
-                        
-                        # Classify signals
-                        signal_direction = "BUY" if analysis['daily_composite'] > 0 else "SELL"
-                        daily_signal = (
-                            "STRONG BUY" if analysis['daily_composite'] > analysis['daily_upper_limit']
-                            else "STRONG SELL" if analysis['daily_composite'] < analysis['daily_lower_limit']
-                            else "WEAK " + signal_direction if signal_strength > 0.5
-                            else "NEUTRAL"
-                        )
-                        
-                        weekly_signal = (
-                            "STRONG BUY" if analysis['weekly_composite'] > analysis['weekly_upper_limit']
-                            else "STRONG SELL" if analysis['weekly_composite'] < analysis['weekly_lower_limit']
-                            else "WEAK BUY" if analysis['weekly_composite'] > 0
-                            else "WEAK SELL" if analysis['weekly_composite'] < 0
-                            else "NEUTRAL"
-                        )
-                                                # Get best parameters
-                        params = self.get_best_params(sym)
-                        params_message = f"\nParameters: {params}"
+            all_params = self._load_all_params()
+            import pandas as pd
+            import pytz
 
-                        message = f"""
-📊 {sym} ({TRADING_SYMBOLS[sym]['name']}) Signals:
+            # One timestamp for the whole invocation; the renderers only
+            # need it for coarse "Xh Ym ago" arithmetic
+            now = pd.Timestamp.now(tz=pytz.UTC)
+
+            async def render_signals(sym):
+                """Build one symbol's signal text; returns (message, has_data)"""
+                try:
+                    analysis = await self._cached_analysis(sym)
+                    if not analysis:
+                        return f"No data available for {sym}", False
+
+                    name = TRADING_SYMBOLS[sym]['name']
+
+                    # Get signal strength and direction
+                    signal_strength = abs(analysis['daily_composite'])
+                    strength_emoji = "🔥" if signal_strength > 0.8 else "💪" if signal_strength > 0.5 else "👍"
+
+                    # Format time since last signal with signal type
+                    last_signal_info = "No signals generated yet"
+                    if analysis.get('last_signal_time') is not None:
+                        last_time = analysis['last_signal_time']
+                        time_diff = now - last_time
+                        hours = int(time_diff.total_seconds() / 3600)
+                        minutes = int((time_diff.total_seconds() % 3600) / 60)
+                        # Get the signal type from the stored composite value
+                        signal_type = "BUY" if analysis['daily_composite'] > 0 else "SELL"
+                        last_signal_info = f"Last {signal_type} signal {strength_emoji}: {last_time.strftime('%Y-%m-%d %H:%M')} UTC ({hours}h {minutes}m ago)"
+
+                    # Classify signals via table lookup: the strong code
+                    # (0, 3 or 4) wins, otherwise fall back to the weak
+                    # code (0, 1 or 2)
+                    dc = analysis['daily_composite']
+                    strong = (dc > analysis['daily_upper_limit']) * 4 + (dc < analysis['daily_lower_limit']) * 3
+                    weak = (signal_strength > 0.5) * (1 + (dc > 0))
+                    daily_signal = self._SIGNAL_TABLE[strong or weak]
+
+                    wc = analysis['weekly_composite']
+                    strong = (wc > analysis['weekly_upper_limit']) * 4 + (wc < analysis['weekly_lower_limit']) * 3
+                    weak = (wc != 0) * (1 + (wc > 0))
+                    weekly_signal = self._SIGNAL_TABLE[strong or weak]
+                    # Get best parameters
+                    params = all_params.get(sym, {}).get('best_params', "Using default parameters")
+                    params_message = f"\nParameters: {params}"
+
+                    return f"""
+📊 {sym} ({name}) Signals:
 ⏱ {last_signal_info}
 
 Daily Signal: {daily_signal}
@@ -587,17 +846,14 @@ Weekly Signal: {weekly_signal}
 
 Price Changes:
 • 5min: {analysis['price_change_5m']*100:.2f}%
-• 1hr: {analysis['price_change_1h']*100:.2f}%"""
-                        chunk_messages.append(message)
-                    except Exception as e:
-                        chunk_messages.append(f"Error analyzing {sym}: {str(e)}")
-                
-                if chunk_messages:
-                    await update.message.reply_text("\n---\n".join(chunk_messages))
-            
-            if not has_data:
-                await update.message.reply_text("❌ No signals available. The market may be closed or there might be connection issues.")
-                
+• 1hr: {analysis['price_change_1h']*100:.2f}%""", True
+                except Exception as e:
+                    return f"Error analyzing {sym}: {str(e)}", False
+
+            await self._run_per_symbol(
+                update, context, render_signals,
+                "❌ No signals available. The market may be closed or there might be connection issues.")
+
         except Exception as e:
             await update.message.reply_text(f"❌ Error getting signals: {str(e)}")
 
@@ -608,10 +864,11 @@ Price Changes:
             
             for symbol in self.symbols:
                 config = TRADING_SYMBOLS[symbol]
+                hours = config['market_hours']
                 market_info.append(f"""
 {symbol} ({config['name']}) ({config['market']}):
-• Trading Hours: {config['market_hours']['start']} - {config['market_hours']['end']}
-• Timezone: {config['market_hours']['timezone']}
+• Trading Hours: {hours['start']} - {hours['end']}
+• Timezone: {hours['timezone']}
                 """)
             
             await update.message.reply_text("🕒 Market Hours:\n" + "\n".join(market_info))
@@ -641,306 +898,303 @@ Price Changes:
 
     async def open_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Open a new position with specified amount"""
-        try:
-            if not context.args or len(context.args) != 2:
-                await update.message.reply_text(
-                    "❌ Usage: /open <symbol> <amount>\n"
-                    "Example: /open SPY 1000 (to open $1000 position in SPY)"
-                )
-                return
-            
-            symbol = context.args[0].upper()
-            try:
-                amount = float(context.args[1])
-            except ValueError:
-                await update.message.reply_text("❌ Amount must be a number")
-                return
-            
-            if symbol not in self.symbols:
-                await update.message.reply_text(f"❌ Invalid symbol: {symbol}")
-                return
-            
-            if amount <= 0:
-                await update.message.reply_text("❌ Amount must be positive")
-                return
-            
-            # Get current price from strategy
-            analysis = self.strategies[symbol].analyze()
-            if not analysis:
-                await update.message.reply_text(f"❌ Unable to get current price for {symbol}")
-                return
-            
-            current_price = analysis['current_price']
-            
-            # Execute the trade using the appropriate executor
-            await self.executors[symbol].open_position(amount, current_price, self.send_message)
-            
-        except Exception as e:
-            await update.message.reply_text(f"❌ Error opening position: {str(e)}")
+        m = _OPEN_RE.match(' '.join(context.args)) if context.args else None
+        if m is None:
+            await update.message.reply_text(
+                "❌ Usage: /open <symbol> <amount>\n"
+                "Example: /open SPY 1000 (to open $1000 position in SPY)"
+            )
+            return
+
+        symbol = m.group(1).upper()
+        if symbol not in self._symbol_set:
+            await update.message.reply_text(f"❌ Invalid symbol: {symbol}")
+            return
+
+        amount = float(m.group(2))
+        if amount <= 0:
+            await update.message.reply_text("❌ Amount must be positive")
+            return
+
+        # Get current price from strategy
+        analysis = await self._cached_analysis(symbol)
+        if not analysis:
+            await update.message.reply_text(f"❌ Unable to get current price for {symbol}")
+            return
+
+        current_price = analysis['current_price']
+
+        # Execute the trade using the appropriate executor
+        await self.executors[symbol].open_position(amount, current_price, self.send_message)
 
     async def close_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Close positions"""
-        try:
-            # If no symbol specified, close all positions
-            symbol = context.args[0].upper() if context.args else None
-            
-            if symbol and symbol not in self.symbols:
-                await update.message.reply_text(f"❌ Invalid symbol: {symbol}")
-                return
-            
-            symbols_to_close = [symbol] if symbol else self.symbols
-            success_count = 0
-            
-            for sym in symbols_to_close:
-                try:
-                    if await self.executors[sym].close_position(self.send_message):
-                        success_count += 1
-                except Exception as e:
-                    await update.message.reply_text(f"❌ Error closing {sym} position: {str(e)}")
-            
-            if success_count > 0:
-                message = f"Successfully closed {success_count} position(s)"
-                if symbol:
-                    message += f" for {symbol}"
-                await update.message.reply_text(message)
-            elif not symbol:  # No positions were closed when trying to close all
-                await update.message.reply_text("No open positions to close")
-            
-        except Exception as e:
-            await update.message.reply_text(f"❌ Error closing positions: {str(e)}")
+        # If no symbol specified, close all positions
+        symbol = context.args[0].upper() if context.args else None
+
+        if symbol and symbol not in self._symbol_set:
+            await update.message.reply_text(f"❌ Invalid symbol: {symbol}")
+            return
+
+        symbols_to_close = [symbol] if symbol else self.symbols
+        success_count = 0
+
+        for sym in symbols_to_close:
+            try:
+                if await self.executors[sym].close_position(self.send_message):
+                    success_count += 1
+            except Exception as e:
+                await update.message.reply_text(f"❌ Error closing {sym} position: {str(e)}")
+
+        if success_count > 0:
+            message = f"Successfully closed {success_count} position(s)"
+            if symbol:
+                message += f" for {symbol}"
+            await update.message.reply_text(message)
+        elif not symbol:  # No positions were closed when trying to close all
+            await update.message.reply_text("No open positions to close")
 
     async def backtest_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Run backtest simulation"""
-        try:
-            # Parse arguments
-            args = context.args if context.args else []
-            
-            # Default values
-            days = 5
-            
-            if not args:
-                await update.message.reply_text(
-                    "Usage:\n"
-                    "/backtest [days] - Run backtest on all symbols\n"
-                    "/backtest <symbol> [days] - Run backtest on specific symbol\n"
-                    "/backtest portfolio [days] - Run portfolio backtest"
-                )
+        from backtest import run_portfolio_backtest, create_portfolio_backtest_plot, create_portfolio_with_prices_plot
+        from backtest_individual import run_backtest, create_backtest_plot
+        import numpy as np
+
+        # Parse arguments
+        args = context.args if context.args else []
+
+        # Default values
+        days = 5
+
+        if not args:
+            await update.message.reply_text(
+                "Usage:\n"
+                "/backtest [days] - Run backtest on all symbols\n"
+                "/backtest <symbol> [days] - Run backtest on specific symbol\n"
+                "/backtest portfolio [days] - Run portfolio backtest"
+            )
+            return
+
+        # Handle portfolio backtest
+        if args[0].lower() == 'portfolio':
+            if len(args) >= 2:
+                try:
+                    days = int(args[1])
+                except ValueError:
+                    await update.message.reply_text("❌ Days must be a number")
+                    return
+
+            # Validate days
+            if days <= 0 or days > default_backtest_interval:
+                await update.message.reply_text(f"❌ Days must be between 1 and {default_backtest_interval}, currently {days}")
                 return
-            
-            # Handle portfolio backtest
-            if args[0].lower() == 'portfolio':
-                if len(args) >= 2:
+
+            status_message = await update.message.reply_text(f"🔄 Starting portfolio backtest for the last {days} days...")
+
+            try:
+                # Create async task for the backtest
+                async def run_backtest_task():
                     try:
-                        days = int(args[1])
-                    except ValueError:
-                        await update.message.reply_text("❌ Days must be a number")
-                        return
-                
-                # Validate days
-                if days <= 0 or days > default_backtest_interval:
-                    await update.message.reply_text(f"❌ Days must be between 1 and {default_backtest_interval}, currently {days}")
-                    return
-                
-                status_message = await update.message.reply_text(f"🔄 Starting portfolio backtest for the last {days} days...")
-                
-                try:
-                    # Create async task for the backtest
-                    async def run_backtest_task():
-                        try:
-                            # Create a closure to track progress
-                            symbols_processed = 0
-                            total_symbols = len(self.symbols)
-                            loop = asyncio.get_running_loop()
-                            
-                            def progress_callback(symbol):
-                                nonlocal symbols_processed
-                                symbols_processed += 1
-                                # Schedule the coroutine on the event loop
-                                loop.call_soon_threadsafe(
-                                    lambda: asyncio.create_task(
-                                        self._update_backtest_progress(
-                                            status_message,
-                                            symbols_processed,
-                                            total_symbols,
-                                            symbol
-                                        )
-                                    )
-                                )
-                            
+                        # Create a closure to track progress
+                        symbols_processed = 0
+                        total_symbols = len(self.symbols)
+                        loop = asyncio.get_running_loop()
+
+                        def progress_callback(symbol):
+                            nonlocal symbols_processed
+                            symbols_processed += 1
+                            # Runs on the executor thread, so schedule the
+                            # coroutine in one thread-safe hop; create_task
+                            # is not safe to call from outside the loop
+                            asyncio.run_coroutine_threadsafe(
+                                self._update_backtest_progress(
+                                    status_message,
+                                    symbols_processed,
+                                    total_symbols,
+                                    symbol
+                                ),
+                                loop
+                            )
+
+                        # Reuse today's result for the same symbols and
+                        # horizon if we already simulated it
+                        cache_key = (tuple(sorted(self.symbols)), days,
+                                     datetime.now().date().isoformat())
+                        result = _read_bt_cache(cache_key)
+                        cache_hit = result is not None
+
+                        if not cache_hit:
                             # Run portfolio backtest with progress updates
                             result = await loop.run_in_executor(
                                 None,
                                 lambda: run_portfolio_backtest(
-                                    self.symbols, 
-                                    days, 
+                                    self.symbols,
+                                    days,
                                     progress_callback=progress_callback
                                 )
                             )
-                            
-                            # Calculate final allocations based on position values at the end
-                            # This will be our definitive allocation used for both display and invest
-                            individual_results = result['individual_results']
-                            last_data_point = result['data'].iloc[-1]
-                            
-                            # Get position values for the crypto assets
-                            symbol_position_values = {}
-                            total_position_value = 0
-                            
-                            for symbol in self.symbols:
-                                position_value_col = f'{symbol}_value'
-                                if position_value_col in last_data_point:
-                                    position_value = last_data_point[position_value_col]
-                                    symbol_position_values[symbol] = position_value
-                                    total_position_value += position_value
-                            
-                            # Calculate allocations as a percentage of total positions
-                            # This is critical - this is the actual allocation used in the graph
+
+                        # Calculate final allocations based on position values at the end
+                        # This will be our definitive allocation used for both display and invest
+                        individual_results = result['individual_results']
+                        last_data_point = result['data'].iloc[-1]
+
+                        # Calculate allocations as a percentage of total positions
+                        # This is critical - this is the actual allocation used in the graph.
+                        # One reindex/sum/divide at C level replaces the
+                        # per-symbol Python loop over the Series
+                        vals = last_data_point.reindex(self._value_cols).to_numpy(
+                            dtype=np.float64, na_value=0.0)
+                        total_position_value = vals.sum()
+                        if total_position_value > 0:
+                            allocations = dict(zip(self.symbols, (vals / total_position_value).tolist()))
+                        else:
                             allocations = {}
-                            if total_position_value > 0:
-                                for symbol, value in symbol_position_values.items():
-                                    allocations[symbol] = value / total_position_value
-                            
-                            # Store this allocation in the result for future reference
-                            result['allocations'] = allocations
-                            
-                            # Get crypto symbols
-                            crypto_symbols = [s for s in self.symbols if TRADING_SYMBOLS[s]['market'] == 'CRYPTO']
-                            
-                            # Calculate metrics
-                            metrics = result['metrics']
-                            summary = (
-                                f"📊 Portfolio Backtest Results ({days} days)\n\n"
-                                f"Initial Capital: ${metrics['initial_capital']:,.2f}\n"
-                                f"Final Value: ${metrics['final_value']:,.2f}\n"
-                                f"Total Return: {metrics['total_return']:.2f}%\n"
-                                f"Max Drawdown: {metrics['max_drawdown']:.2f}%\n"
-                                f"Capital Multiplier: {PER_SYMBOL_CAPITAL_MULTIPLIER:.2f}\n"
-                                f"💰 Trading Costs: ${result['metrics']['trading_costs']:.2f}\n"
-                                f"💵 Cash Allocation: {last_data_point['total_cash'] / last_data_point['portfolio_total'] * 100:.1f}%\n"  # Add this line
-                            )
-                            
-                            turnover_msg = (
-                                f"\n🔄 Portfolio Turnover: {metrics['turnover']['turnover']:.1%}\n"
-                                f"📊 Trades: {metrics['turnover']['total_trades']} (Buy: {metrics['turnover']['buy_trades']}, Sell: {metrics['turnover']['sell_trades']})\n"
-                                f"💰 Total Buy Value: ${metrics['turnover']['total_buy_value']:,.2f}\n"
-                                f"💰 Total Sell Value: ${metrics['turnover']['total_sell_value']:,.2f}\n"
-                                f"📦 Avg Buy Size: ${metrics['turnover']['avg_buy_size']:,.2f}\n"
-                                f"📦 Avg Sell Size: ${metrics['turnover']['avg_sell_size']:,.2f}\n\n"
-                            )
-                            summary += turnover_msg
-                            
-                            # Add returns and allocations for each asset
-                            for symbol in self.symbols:
-                                ret = metrics['symbol_returns'].get(symbol, 0)
-                                # Use our calculated allocations to ensure consistency with the graph
+
+                        # Store this allocation in the result for future reference
+                        result['allocations'] = allocations
+
+                        if not cache_hit:
+                            _write_bt_cache(cache_key, result)
+
+                        # Get crypto symbols
+                        crypto_symbols = [s for s in self.symbols if s in self._crypto_symbols]
+
+                        # Calculate metrics
+                        metrics = result['metrics']
+                        # Collect the pieces and join once at the end
+                        # instead of growing an immutable str per line
+                        parts = [self._SUMMARY_TMPL(
+                            days=days,
+                            initial_capital=metrics['initial_capital'],
+                            final_value=metrics['final_value'],
+                            total_return=metrics['total_return'],
+                            max_drawdown=metrics['max_drawdown'],
+                            capital_multiplier=PER_SYMBOL_CAPITAL_MULTIPLIER,
+                            trading_costs=metrics['trading_costs'],
+                            cash_allocation=last_data_point['total_cash'] / last_data_point['portfolio_total'] * 100,
+                        )]
+
+                        parts.append(self._TURNOVER_TMPL(**metrics['turnover']))
+
+                        # Add returns and allocations for each asset
+                        for symbol in self.symbols:
+                            ret = metrics['symbol_returns'].get(symbol, 0)
+                            # Use our calculated allocations to ensure consistency with the graph
+                            alloc = allocations.get(symbol, 0) * 100
+                            # Only include assets with non-zero allocations
+                            if alloc > 0.01:  # Include anything above 0.01%
+                                parts.append(self._RETURN_LINE_TMPL(sym=symbol, ret=ret, alloc=alloc))
+
+                        # Add allocation info for crypto assets specifically
+                        if crypto_symbols:
+                            parts.append("\nCrypto Assets Allocation:\n")
+                            for symbol in crypto_symbols:
                                 alloc = allocations.get(symbol, 0) * 100
-                                # Only include assets with non-zero allocations
                                 if alloc > 0.01:  # Include anything above 0.01%
-                                    summary += f"{symbol}: {ret:.2f}% (Allocation: {alloc:.1f}%)\n"
-                            
-                            # Add allocation info for crypto assets specifically
-                            if crypto_symbols:
-                                summary += "\nCrypto Assets Allocation:\n"
-                                for symbol in crypto_symbols:
-                                    alloc = allocations.get(symbol, 0) * 100
-                                    if alloc > 0.01:  # Include anything above 0.01%
-                                        summary += f"{symbol}: {alloc:.1f}%\n"
-                            
-                            # Edit status message with completion
-                            await status_message.edit_text("✅ Portfolio backtest completed!")
-                            
-                            # Create inline keyboard for buying option
-                            keyboard = [[
-                                InlineKeyboardButton(
-                                    "Buy this allocation", 
-                                    callback_data=f"buy_backtest:portfolio:{days}"
-                                )
-                            ]]
-                            reply_markup = InlineKeyboardMarkup(keyboard)
-                            
-                            # Store the result so invest_command can access it later
-                            self._last_portfolio_backtest = {
-                                'result': result,
-                                'days': days,
-                                'allocations': allocations
-                            }
-                            
-                            # Send summary message with buy button
-                            await update.message.reply_text(summary, reply_markup=reply_markup)
-                            
-                            # Generate and send plots
-                            plot_buffer = await loop.run_in_executor(
-                                None,
-                                lambda: create_portfolio_backtest_plot(result)
-                            )
-                            await update.message.reply_photo(plot_buffer)
-                            
-                            prices_plot_buffer = await loop.run_in_executor(
-                                None,
-                                lambda: create_portfolio_with_prices_plot(result)
-                            )
-                            await update.message.reply_photo(prices_plot_buffer)
-                            
-                        except Exception as e:
-                            logger.error(f"Error in backtest task: {str(e)}")
-                            await update.message.reply_text(f"❌ An error occurred: {str(e)}")
-                    
-                    await run_backtest_task()
-                    
-                except Exception as e:
-                    logger.error(f"Error running backtest: {str(e)}")
-                    await update.message.reply_text(f"❌ An error occurred while running backtest: {str(e)}")
-                
-                return
-            
-            # Handle regular backtest
-            try:
-                days = int(args[0])
-                symbol = None
-            except ValueError:
-                symbol = args[0].upper()
-                if len(args) >= 2:
-                    try:
-                        days = int(args[1])
-                    except ValueError:
-                        await update.message.reply_text("❌ Days must be a number")
-                        return
-            
-            # Validate symbol if provided
-            if symbol and symbol not in self.symbols:
-                await update.message.reply_text(f"❌ Invalid symbol: {symbol}\nAvailable symbols: {', '.join(self.symbols)}")
-                return
-            
-            # Validate days
-            if days <= 0 or days > default_backtest_interval:
-                await update.message.reply_text(f"❌ Days must be between 1 and {default_backtest_interval}, currently {days}")
-                return
-            
-            symbols_to_test = [symbol] if symbol else self.symbols
-            
-            status_message = await update.message.reply_text(f"🔄 Starting backtest for the last {days} days...")
-            
-            # Run backtest for each symbol
-            for sym in symbols_to_test:
-                # Get best parameters
-                params = self.get_best_params(sym)
-                params_message = f"\nParameters: {params}"
+                                    parts.append(self._ALLOC_LINE_TMPL(sym=symbol, alloc=alloc))
+
+                        # Edit status message with completion
+                        await status_message.edit_text("✅ Portfolio backtest completed!")
+
+                        # Create inline keyboard for buying option
+                        reply_markup = _buy_markup('portfolio', days)
+
+                        # Store the result so invest_command can access it later
+                        self._last_portfolio_backtest = {
+                            'result': result,
+                            'days': days,
+                            'allocations': allocations
+                        }
+
+                        # Send summary message with buy button
+                        summary = "".join(parts)
+                        await update.message.reply_text(summary, reply_markup=reply_markup)
+
+                        # Generate and send plots: queue both renders up
+                        # front (the plot pool serializes pyplot work but
+                        # the second draw overlaps the first upload) and
+                        # let the sends go out together
+                        plot_buffer, prices_plot_buffer = await asyncio.gather(
+                            loop.run_in_executor(_PLOT_POOL, create_portfolio_backtest_plot, result),
+                            loop.run_in_executor(_PLOT_POOL, create_portfolio_with_prices_plot, result),
+                        )
+                        # One sendMediaGroup round trip instead of two
+                        # photo uploads
+                        await update.message.reply_media_group([
+                            InputMediaPhoto(plot_buffer),
+                            InputMediaPhoto(prices_plot_buffer),
+                        ])
+
+                    except Exception as e:
+                        logger.error(f"Error in backtest task: {str(e)}")
+                        await update.message.reply_text(f"❌ An error occurred: {str(e)}")
+
+                await run_backtest_task()
+
+            except Exception as e:
+                logger.error(f"Error running backtest: {str(e)}")
+                await update.message.reply_text(f"❌ An error occurred while running backtest: {str(e)}")
+
+            return
 
+        # Handle regular backtest
+        try:
+            days = int(args[0])
+            symbol = None
+        except ValueError:
+            symbol = args[0].upper()
+            if len(args) >= 2:
                 try:
-                    # Run backtest simulation asynchronously
-                    result = await asyncio.get_event_loop().run_in_executor(
-                        None,
-                        lambda: run_backtest(sym, days)
-                    )
-                    
-                    # Generate plot in executor
-                    buf, stats = await asyncio.get_event_loop().run_in_executor(
-                        None,
-                        lambda: create_backtest_plot(result)
-                    )
-                    
-                    # Create performance message
-                    message = f"""
+                    days = int(args[1])
+                except ValueError:
+                    await update.message.reply_text("❌ Days must be a number")
+                    return
+
+        # Validate symbol if provided
+        if symbol and symbol not in self._symbol_set:
+            await update.message.reply_text(f"❌ Invalid symbol: {symbol}\nAvailable symbols: {', '.join(self.symbols)}")
+            return
+
+        # Validate days
+        if days <= 0 or days > default_backtest_interval:
+            await update.message.reply_text(f"❌ Days must be between 1 and {default_backtest_interval}, currently {days}")
+            return
+
+        symbols_to_test = [symbol] if symbol else self.symbols
+
+        status_message = await update.message.reply_text(f"🔄 Starting backtest for the last {days} days...")
+
+        loop = asyncio.get_running_loop()
+
+        async def backtest_symbol(sym):
+            """Simulate one symbol on the process pool, then render its plot"""
+            try:
+                result = await loop.run_in_executor(self._cpu_pool, run_backtest, sym, days)
+                buf, stats = await loop.run_in_executor(_PLOT_POOL, create_backtest_plot, result)
+                return sym, buf, stats, None
+            except Exception as e:
+                return sym, None, None, e
+
+        # Dispatch every simulation at once so N symbols take roughly
+        # the wall time of the slowest, and report each as it finishes
+        tasks = [asyncio.create_task(backtest_symbol(sym)) for sym in symbols_to_test]
+        for fut in asyncio.as_completed(tasks):
+            sym, buf, stats, err = await fut
+
+            if err is not None:
+                error_msg = str(err)
+                if "Error running backtest for" in error_msg:
+                    error_msg = error_msg.split(": ", 1)[1]  # Get the actual error message
+                await update.message.reply_text(f"❌ Could not run backtest for {sym}: {error_msg}")
+                continue
+
+            # Get best parameters
+            params = self.get_best_params(sym)
+            params_message = f"\nParameters: {params}"
+
+            # Create performance message
+            message = f"""
 📊 {sym} ({TRADING_SYMBOLS[sym]['name']}) Backtest Results ({days} days):
 • Total Return: {stats['total_return']:.2f}%
 • Total Trades: {stats['total_trades']}
@@ -950,107 +1204,104 @@ Price Changes:
 • 🔄 Portfolio Turnover: {stats.get('turnover', 0):.1%}
 • 💰 Trading Costs: ${stats.get('trading_costs', 0):.2f}
 {params_message}
-                    """
-                    
-                    # Send plot and stats
-                    await context.bot.send_photo(
-                        chat_id=update.effective_chat.id,
-                        photo=buf,
-                        caption=message,
-                        parse_mode='HTML'
-                    )
-                    
-                    # Update status for multiple symbols
-                    if len(symbols_to_test) > 1:
-                        await status_message.edit_text(f"✅ Completed {sym}, processing next symbol...")
-                        
-                except Exception as e:
-                    error_msg = str(e)
-                    if "Error running backtest for" in error_msg:
-                        error_msg = error_msg.split(": ", 1)[1]  # Get the actual error message
-                    await update.message.reply_text(f"❌ Could not run backtest for {sym}: {error_msg}")
-            
-            # Final status update
+                """
+
+            # Send plot and stats
+            await context.bot.send_photo(
+                chat_id=update.effective_chat.id,
+                photo=buf,
+                caption=message,
+                parse_mode='HTML'
+            )
+
+            # Update status for multiple symbols
             if len(symbols_to_test) > 1:
-                await status_message.edit_text("✅ All backtests completed!")
-            else:
-                await status_message.edit_text("✅ Backtest completed!")
-                
-        except ValueError as e:
-            await update.message.reply_text(f"❌ Invalid input: {str(e)}")
-        except Exception as e:
-            logger.error(f"Backtest command error: {str(e)}")
-            await update.message.reply_text(f"❌ Error: {str(e)}")
+                await status_message.edit_text(f"✅ Completed {sym}, processing next symbol...")
+
+        # Final status update
+        if len(symbols_to_test) > 1:
+            await status_message.edit_text("✅ All backtests completed!")
+        else:
+            await status_message.edit_text("✅ Backtest completed!")
 
     async def _update_backtest_progress(self, message, processed, total, current_symbol):
-        """Update the backtest progress message"""
+        """Update the backtest progress message, coalescing bursts of edits.
+
+        Only one editMessageText is in flight at a time: updates that
+        arrive meanwhile just overwrite the latest snapshot, which the
+        in-flight call drains at most every half second. This keeps fast
+        backtests from flooding Telegram's edit rate limit.
+        """
+        self._progress_latest = (processed, total, current_symbol)
+        if self._progress_pending:
+            return
+        self._progress_pending = True
         try:
-            progress = (processed / total) * 100
-            await message.edit_text(
-                f"🔄 Running portfolio backtest...\n"
-                f"Progress: {progress:.1f}%\n"
-                f"Currently processing: {current_symbol}"
-            )
-        except Exception as e:
-            logger.error(f"Error updating backtest progress: {e}")
+            sent = None
+            while self._progress_latest != sent:
+                sent = self._progress_latest
+                processed, total, current_symbol = sent
+                progress = (processed / total) * 100
+                try:
+                    await message.edit_text(
+                        f"🔄 Running portfolio backtest...\n"
+                        f"Progress: {progress:.1f}%\n"
+                        f"Currently processing: {current_symbol}"
+                    )
+                except Exception as e:
+                    logger.error(f"Error updating backtest progress: {e}")
+                # Minimum interval between edits
+                await asyncio.sleep(0.5)
+        finally:
+            self._progress_pending = False
 
     async def portfolio_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Send portfolio history graph"""
-        try:
-            # Get command arguments
-            args = context.args
-            timeframe = '1D'  # default
-            period = '1M'     # default
-            
-            if len(args) >= 1:
-                timeframe = args[0]
-            if len(args) >= 2:
-                period = args[1]
-                
-            # Get portfolio history
-            portfolio_history = get_portfolio_history(timeframe=timeframe, period=period)
-            
-            # Create plot
-            plot_buffer = create_portfolio_plot(portfolio_history)
-            
-            # Send plot
-            await update.message.reply_photo(
-                photo=plot_buffer,
-                caption=f'Portfolio History (Timeframe: {timeframe}, Period: {period})'
-            )
-            
-        except Exception as e:
-            logger.error(f"Error in portfolio_command: {str(e)}")
-            await update.message.reply_text(f"Error getting portfolio history: {str(e)}")
+        from portfolio import get_portfolio_history, create_portfolio_plot
+
+        # Get command arguments
+        args = context.args
+        timeframe = '1D'  # default
+        period = '1M'     # default
+
+        if len(args) >= 1:
+            timeframe = args[0]
+        if len(args) >= 2:
+            period = args[1]
+
+        # Get portfolio history
+        portfolio_history = get_portfolio_history(timeframe=timeframe, period=period)
+
+        # Create plot
+        plot_buffer = create_portfolio_plot(portfolio_history)
+
+        # Send plot
+        await update.message.reply_photo(
+            photo=plot_buffer,
+            caption=f'Portfolio History (Timeframe: {timeframe}, Period: {period})'
+        )
 
     async def rank_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Display performance ranking of all assets"""
-        try:
-            # Get performance data for all symbols
-            rankings = {}
-            performances = {}
-            for symbol in self.symbols:
-                executor = self.executors[symbol]
-                analysis = self.strategies[symbol].analyze()
-                if analysis and 'current_price' in analysis:
-                    rank, performance = executor.calculate_performance_ranking(analysis['current_price'])
-                    rankings[symbol] = rank
-                    performances[symbol] = performance
-
-            # Sort symbols by ranking (best to worst)
-            sorted_rankings = sorted(rankings.items(), key=lambda x: x[1], reverse=True)
-
-            # Format message
-            message = "📊 Asset Performance Ranking:\n\n"
-            for i, (symbol, rank) in enumerate(sorted_rankings, 1):
-                perf = performances[symbol]
-                message += f"{i}. {get_display_symbol(symbol)}: {perf:.1f}% (Percentile: {rank*100:.1f}%)\n"
+        # Analyze all symbols concurrently, then collect one pass of
+        # (symbol, rank, performance) tuples
+        analyses = await asyncio.gather(*(self._cached_analysis(s) for s in self.symbols))
 
-            await update.message.reply_text(message)
+        rows = []
+        for symbol, analysis in zip(self.symbols, analyses):
+            if analysis and 'current_price' in analysis:
+                rank, performance = self.executors[symbol].calculate_performance_ranking(analysis['current_price'])
+                rows.append((symbol, rank, performance))
 
-        except Exception as e:
-            logger.error(f"Error in /rank command: {e}")
-            await update.message.reply_text("❌ Error generating performance ranking. Please try again later.")
+        # Sort symbols by ranking (best to worst)
+        rows.sort(key=operator.itemgetter(1), reverse=True)
+
+        # Format message
+        parts = ["📊 Asset Performance Ranking:\n\n"]
+        for i, (symbol, rank, perf) in enumerate(rows, 1):
+            parts.append(f"{i}. {get_display_symbol(symbol)}: {perf:.1f}% (Percentile: {rank*100:.1f}%)\n")
+
+        await update.message.reply_text("".join(parts))
 
     async def button_callback(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Handle button callbacks"""
@@ -1070,68 +1321,76 @@ Price Changes:
 
     async def invest_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Handle investment based on backtest results"""
-        try:
-            if len(context.args) != 3:
-                await update.message.reply_text(
-                    "❌ Invalid format. Use:\n"
-                    "/invest <backtest_type> <days> <amount>\n"
-                    "Example: /invest portfolio 5 1000"
-                )
-                return
-                
-            backtest_type, days, amount = context.args
-            days = int(days)
-            amount = float(amount)
-            
-            # Check if we have cached results from the previous backtest
-            if backtest_type.lower() == 'portfolio' and hasattr(self, '_last_portfolio_backtest'):
-                cached_backtest = self._last_portfolio_backtest
-                
-                # Verify days parameter matches
-                if cached_backtest['days'] == days:
-                    # Use the allocations directly from the cached result
-                    allocations = cached_backtest['allocations']
-                    
-                    # Get crypto symbols with their allocations
-                    crypto_symbols = [s for s in allocations.keys() 
-                                    if TRADING_SYMBOLS.get(s, {}).get('market') == 'CRYPTO' 
-                                    and allocations.get(s, 0) > 0]
-                    
-                    if not crypto_symbols:
-                        await update.message.reply_text("❌ No crypto assets with non-zero allocations in the backtest portfolio")
-                        return
-                    
-                    # Show planned allocations
-                    allocation_msg = "📊 Planned allocations:\n"
-                    for symbol in crypto_symbols:
-                        allocation_msg += f"{symbol}: ${amount * allocations[symbol]:.2f} ({allocations[symbol]*100:.1f}%)\n"
-                    await update.message.reply_text(allocation_msg)
-                    
-                    # First close all existing crypto positions
-                    for symbol in crypto_symbols:
-                        # Use close_command directly
-                        context.args = [symbol]  # Set the symbol as argument
-                        await self.close_command(update, context)
-                    
-                    # Now open new positions
-                    status_message = await update.message.reply_text("🔄 Opening new positions...")
-                    
-                    for symbol in crypto_symbols:
-                        # Calculate amount for this symbol
-                        symbol_amount = amount * allocations[symbol]
-                        
-                        # Use open_command directly
-                        context.args = [symbol, str(symbol_amount)]  # Set symbol and amount as arguments
-                        await self.open_command(update, context)
-                    
-                    await status_message.edit_text("✅ Portfolio reallocation completed!")
+        if len(context.args) != 3:
+            await update.message.reply_text(
+                "❌ Invalid format. Use:\n"
+                "/invest <backtest_type> <days> <amount>\n"
+                "Example: /invest portfolio 5 1000"
+            )
+            return
+
+        backtest_type, days, amount = context.args
+        days = int(days)
+        amount = float(amount)
+
+        # Check if we have cached results from the previous backtest
+        if backtest_type.lower() == 'portfolio' and hasattr(self, '_last_portfolio_backtest'):
+            cached_backtest = self._last_portfolio_backtest
+
+            # Verify days parameter matches
+            if cached_backtest['days'] == days:
+                # Use the allocations directly from the cached result
+                allocations = cached_backtest['allocations']
+
+                # Get crypto symbols with their allocations
+                crypto_symbols = [s for s, alloc in allocations.items()
+                                if s in self._crypto_symbols and alloc > 0]
+
+                if not crypto_symbols:
+                    await update.message.reply_text("❌ No crypto assets with non-zero allocations in the backtest portfolio")
                     return
-            
-            # If no cached results or different days parameter, run a new backtest
-            await update.message.reply_text("No matching backtest data found. Please run /backtest portfolio first.")
-                        
-        except ValueError as e:
-            await update.message.reply_text(f"❌ Invalid input: {str(e)}")
-        except Exception as e:
-            logger.error(f"Error in invest command: {str(e)}")
-            await update.message.reply_text(f"❌ An error occurred: {str(e)}")
+
+                # Show planned allocations
+                allocation_msg = "📊 Planned allocations:\n"
+                for symbol in crypto_symbols:
+                    allocation_msg += f"{symbol}: ${amount * allocations[symbol]:.2f} ({allocations[symbol]*100:.1f}%)\n"
+                await update.message.reply_text(allocation_msg)
+
+                # First close all existing crypto positions, concurrently
+                # and through the executors directly - re-entering the
+                # command layer would re-parse args and re-validate per
+                # symbol (and mutating context.args is fragile)
+                close_results = await asyncio.gather(
+                    *(self.executors[s].close_position(self.send_message) for s in crypto_symbols),
+                    return_exceptions=True)
+                for sym, res in zip(crypto_symbols, close_results):
+                    if isinstance(res, Exception):
+                        await update.message.reply_text(f"❌ Error closing {sym} position: {str(res)}")
+
+                # Now open new positions
+                status_message = await update.message.reply_text("🔄 Opening new positions...")
+
+                # One concurrent analysis pass for current prices
+                analyses = await asyncio.gather(*(self._cached_analysis(s) for s in crypto_symbols))
+
+                to_open = []
+                for sym, analysis in zip(crypto_symbols, analyses):
+                    if analysis and 'current_price' in analysis:
+                        to_open.append((sym, analysis['current_price']))
+                    else:
+                        await update.message.reply_text(f"❌ Unable to get current price for {sym}")
+
+                open_results = await asyncio.gather(
+                    *(self.executors[sym].open_position(
+                        amount * allocations[sym], price, self.send_message)
+                      for sym, price in to_open),
+                    return_exceptions=True)
+                for (sym, _), res in zip(to_open, open_results):
+                    if isinstance(res, Exception):
+                        await update.message.reply_text(f"❌ Error opening {sym} position: {str(res)}")
+
+                await status_message.edit_text("✅ Portfolio reallocation completed!")
+                return
+
+        # If no cached results or different days parameter, run a new backtest
+        await update.message.reply_text("No matching backtest data found. Please run /backtest portfolio first.")
@@ -1,4 +1,7 @@
+import asyncio
+import functools
 import logging
+from concurrent.futures import ThreadPoolExecutor
 import numpy as np
 from alpaca.trading.client import TradingClient
 from alpaca.trading.requests import MarketOrderRequest
@@ -12,6 +15,16 @@ import yfinance as yf
 
 logger = logging.getLogger(__name__)
 
+# The alpaca-py TradingClient is a synchronous requests-based SDK; running its
+# calls on this small dedicated pool keeps the event loop thread free for
+# Telegram handling and timers instead of blocking on every roundtrip
+_POOL = ThreadPoolExecutor(max_workers=4, thread_name_prefix="alpaca")
+
+async def _call(fn, *args, **kwargs):
+    """Run a blocking SDK call on the executor pool and await its result"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_POOL, functools.partial(fn, *args, **kwargs))
+
 class TradingExecutor:
     def __init__(self, trading_client: TradingClient, symbol: str):
         self.trading_client = trading_client
@@ -198,7 +211,7 @@ class TradingExecutor:
             # For buy orders, calculate new position size
             if action == "BUY":
                 # Calculate performance ranking
-                rank, performance = self.calculate_performance_ranking(analysis['current_price'])
+                rank, performance = await _call(self.calculate_performance_ranking, analysis['current_price'])
                 
                 # Calculate buy percentage (linear function)
                 # rank 1 (best) = 50% buy
@@ -222,11 +235,11 @@ class TradingExecutor:
                 buy_percentage = calculate_buy_percentage(rank)
                 
                 # Calculate account equity
-                account = self.trading_client.get_account()
+                account = await _call(self.trading_client.get_account)
                 equity = float(account.equity)
-                
+
                 # Calculate position size based on buy percentage
-                max_position_size = self.calculate_position_size(analysis['current_price'])
+                max_position_size = await _call(self.calculate_position_size, analysis['current_price'])
                 new_qty = max_position_size * buy_percentage
               
                 
@@ -243,7 +256,7 @@ class TradingExecutor:
                 
                 # Get total position value (existing + new)
                 try:
-                    position = self.trading_client.get_open_position(get_api_symbol(self.symbol))
+                    position = await _call(self.trading_client.get_open_position, get_api_symbol(self.symbol))
                     existing_position_value = float(position.market_value)
                 except Exception:
                     existing_position_value = 0
@@ -285,8 +298,8 @@ class TradingExecutor:
                     time_in_force=TimeInForce.GTC if self.config['market'] == 'CRYPTO' else TimeInForce.DAY
                 )
                 
-                submitted_order = self.trading_client.submit_order(order)
-                
+                submitted_order = await _call(self.trading_client.submit_order, order)
+
                 # Create detailed order confirmation message
                 message = f"""✅ BUY Order Executed for {get_display_symbol(self.symbol)} ({self.config['name']}):
 • Performance Rank: {rank:.2f}
@@ -310,12 +323,12 @@ class TradingExecutor:
             # For sell orders, get current position
             else:
                 try:
-                    position = self.trading_client.get_open_position(get_api_symbol(self.symbol))
+                    position = await _call(self.trading_client.get_open_position, get_api_symbol(self.symbol))
                     total_qty = abs(float(position.qty))
                     avg_entry_price = float(position.avg_entry_price)
-                    
+
                     # Calculate performance ranking and sell percentage
-                    rank, performance = self.calculate_performance_ranking(analysis['current_price'])
+                    rank, performance = await _call(self.calculate_performance_ranking, analysis['current_price'])
                     
                     # Calculate sell percentage (linear function)
                     # rank 1 (best) = 10% sell
@@ -356,8 +369,8 @@ class TradingExecutor:
                         time_in_force=TimeInForce.GTC if self.config['market'] == 'CRYPTO' else TimeInForce.DAY
                     )
                     
-                    submitted_order = self.trading_client.submit_order(order)
-                    
+                    submitted_order = await _call(self.trading_client.submit_order, order)
+
                     # Create detailed order confirmation message
                     message = f"""✅ SELL Order Executed for {get_display_symbol(self.symbol)} ({self.config['name']}):
 • Performance Rank: {rank:.2f}
@@ -429,7 +442,7 @@ class TradingExecutor:
             )
             
             # Submit the order and get confirmation
-            submitted_order = self.trading_client.submit_order(order)
+            submitted_order = await _call(self.trading_client.submit_order, order)
             
             # Initial order message
             message = f"""🔄 Opening position: BUY {shares} {get_display_symbol(self.symbol)} (${amount:.2f}) at ${current_price:.2f}
@@ -439,11 +452,10 @@ Order ID: {submitted_order.id}"""
                 await notify_callback(message)
             
             # Wait briefly for order to be processed
-            import asyncio
             await asyncio.sleep(2)
-            
+
             # Get order status
-            order_status = self.trading_client.get_order_by_id(submitted_order.id)
+            order_status = await _call(self.trading_client.get_order_by_id, submitted_order.id)
             
             # Create confirmation message
             if order_status.status == 'filled':
@@ -489,7 +501,7 @@ Order ID: {submitted_order.id}"""
             
             # Get current position
             try:
-                position = self.trading_client.get_open_position(get_api_symbol(self.symbol))
+                position = await _call(self.trading_client.get_open_position, get_api_symbol(self.symbol))
                 shares = abs(float(position.qty))
                 
                 # Submit sell order
@@ -500,8 +512,8 @@ Order ID: {submitted_order.id}"""
                     time_in_force=TimeInForce.GTC if self.config['market'] == 'CRYPTO' else TimeInForce.DAY
                 )
                 
-                self.trading_client.submit_order(order)
-                
+                await _call(self.trading_client.submit_order, order)
+
                 message = f"Closing position: SELL {shares} {get_display_symbol(self.symbol)} ({self.config['name']}) at market price"
                 logger.info(message)
                 if notify_callback: